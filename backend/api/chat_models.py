@@ -9,11 +9,17 @@ class ChatMessage(BaseModel):
     temperature: Optional[float] = 0.7
     top_k_documents: Optional[int] = 3
 
+class ContextPreview(BaseModel):
+    """A retrieved document as reported back in a chat response."""
+    file_name: str
+    similarity_score: float
+    content_preview: str
+
 class ChatResponse(BaseModel):
     """Model for chat responses."""
     response: str
     success: bool
-    context_used: List[Dict[str, Any]]
+    context_used: List[ContextPreview]
     error_message: Optional[str] = None
     metadata: Optional[Dict[str, Any]] = None
 
@@ -1,9 +1,19 @@
 import yaml
 import os
+import copy
+import json
 import logging
+import tempfile
+import threading
+from functools import lru_cache
 from pathlib import Path
 from typing import Dict, Any, Optional
 
+try:
+    from yaml import CSafeLoader as _Loader
+except ImportError:  # PyYAML built without libyaml
+    from yaml import SafeLoader as _Loader
+
 logger = logging.getLogger(__name__)
 
 def get_default_config() -> Dict[str, Any]:
@@ -19,7 +29,14 @@ def get_default_config() -> Dict[str, Any]:
         "rag": {
             "documents_path": "files",
             "supported_file_types": [".txt", ".pdf"],
-            "recurse_folders": False
+            "recurse_folders": False,
+            "pdf_backend": "pypdfium2",
+            "compute_hashes": False,
+            "hash_cache_path": "",
+            "embedding_model": "placeholder",
+            "index_path": "",
+            "quantized_search": False,
+            "ann_search": False
         }
     }
 
@@ -27,6 +44,58 @@ def validate_config(config: Dict[str, Any]) -> Dict[str, Any]:
     """Validate and return configuration."""
     return config
 
+@lru_cache(maxsize=1)
+def _parse(config_path: str, mtime_ns: int, size: int) -> Dict[str, Any]:
+    """
+    Parse the YAML file at config_path.
+
+    Memoized on (path, mtime, size) so an unchanged file is only parsed once per
+    process; only the latest version is kept, since a reload makes the old one stale.
+    A JSON sidecar (<path>.cache.json) lets later processes skip YAML entirely; it is
+    only written when the config survives the JSON round trip unchanged, and it holds
+    the client secret too, so it is only ever readable by the owner (0600).
+    Callers must not mutate the returned dict (load_config hands out copies).
+    """
+    sidecar_path = f"{config_path}.cache.json"
+    try:
+        with open(sidecar_path, 'r', encoding='utf-8') as file:
+            cached = json.load(file)
+        if cached["mtime_ns"] == mtime_ns and cached["size"] == size:
+            return cached["config"]
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+
+    with open(config_path, 'r', encoding='utf-8') as file:
+        config = yaml.load(file, Loader=_Loader)
+
+    try:
+        serialized = json.dumps({"mtime_ns": mtime_ns, "size": size, "config": config})
+        # JSON turns non-string keys into strings, for one; such a config is not cached,
+        # so every process sees what the YAML says
+        if json.loads(serialized)["config"] == config:
+            # A unique temporary file (created 0600), so workers starting together never
+            # touch each other's half-written sidecar
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(sidecar_path),
+                                            prefix=f"{os.path.basename(sidecar_path)}.", suffix=".tmp")
+            try:
+                with open(fd, 'w', encoding='utf-8') as file:
+                    file.write(serialized)
+                os.replace(tmp_path, sidecar_path)
+            except OSError:
+                os.unlink(tmp_path)
+                raise
+    except (OSError, TypeError, ValueError) as e:
+        logger.debug(f"Could not write config cache {sidecar_path}: {e}")
+
+    return config
+
+def _resolve_config_path(config_path: Optional[str] = None) -> str:
+    """Return the absolute config path, defaulting to config.yaml in the config directory."""
+    if config_path is None:
+        config_dir = Path(__file__).parent
+        config_path = config_dir / "config.yaml"
+    return os.path.abspath(config_path)
+
 def load_config(config_path: Optional[str] = None) -> Dict[str, Any]:
     """
     Load configuration from YAML file.
@@ -37,17 +106,17 @@ def load_config(config_path: Optional[str] = None) -> Dict[str, Any]:
     Returns:
         Dictionary containing configuration
     """
-    if config_path is None:
-        config_dir = Path(__file__).parent
-        config_path = config_dir / "config.yaml"
+    config_path = _resolve_config_path(config_path)
 
     try:
-        if not os.path.exists(config_path):
+        try:
+            st = os.stat(config_path)
+        except FileNotFoundError:
             logger.warning(f"Config file not found at {config_path}, using defaults")
             return get_default_config()
 
-        with open(config_path, 'r', encoding='utf-8') as file:
-            config = yaml.safe_load(file)
+        # Copy, so a caller mutating its config can't change what _parse's cache hands out
+        config = copy.deepcopy(_parse(config_path, st.st_mtime_ns, st.st_size))
 
         config = validate_config(config)
         logger.info(f"Configuration loaded from {config_path}")
@@ -72,12 +141,85 @@ class RagConfig:
         self.documents_path = data.get("documents_path")
         self.supported_file_types = data.get("supported_file_types", [".txt", ".pdf"])
         self.recurse_folders = data.get("recurse_folders", False)
+        self.pdf_backend = data.get("pdf_backend", "pypdfium2")
+        self.compute_hashes = data.get("compute_hashes", False)
+        self.hash_cache_path = data.get("hash_cache_path", "")
+        self.embedding_model = data.get("embedding_model", "placeholder")
+        self.index_path = data.get("index_path", "")
+        self.quantized_search = data.get("quantized_search", False)
+        self.ann_search = data.get("ann_search", False)
 
 class Config:
     def __init__(self, config_path: str = None):
-        data = load_config(config_path)
-        self.client = ClientConfig(data.get("client", {}))
-        self.rag = RagConfig(data.get("rag", {}))
+        self._config_path = _resolve_config_path(config_path)
+        self._apply(load_config(self._config_path))
         self.api_token = ""  # Placeholder for API token management
 
+        self._watcher = None
+        if os.environ.get("CONFIG_WATCH") == "1":
+            self._watcher = ConfigWatcher(self, self._config_path)
+            self._watcher.start()
+
+    def _apply(self, data: Dict[str, Any]):
+        # Both sections are swapped in one assignment, so a reload never pairs the new client
+        # with the old rag section
+        self._sections = (ClientConfig(data.get("client", {})), RagConfig(data.get("rag", {})))
+
+    @property
+    def client(self) -> ClientConfig:
+        return self._sections[0]
+
+    @property
+    def rag(self) -> RagConfig:
+        return self._sections[1]
+
+    def reload(self):
+        """
+        Re-read the config file and swap in the new client and rag sections.
+        Only code that reads a section when it runs sees the change: the rag settings used by
+        /load_documents and /documents/stats (documents_path, supported_file_types,
+        recurse_folders, pdf_backend, compute_hashes, hash_cache_path, index_path). The Flow API clients and the RAG service
+        copy theirs (the client section, embedding_model, quantized_search, ann_search) when
+        they are created at import, so changing those still needs a restart.
+        """
+        self._apply(load_config(self._config_path))
+        logger.info(f"Configuration reloaded from {self._config_path}")
+
+class ConfigWatcher:
+    """
+    Polls a config file's mtime from a daemon thread and reloads the Config when it changes
+    (see Config.reload for which settings take effect). Enabled by setting CONFIG_WATCH=1;
+    meant for development.
+    """
+
+    def __init__(self, config: Config, config_path: str, interval: float = 1.0):
+        self._config = config
+        self._config_path = config_path
+        self._interval = interval
+        self._last_mtime_ns = self._mtime_ns()
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="config-watcher", daemon=True)
+
+    def _mtime_ns(self) -> Optional[int]:
+        try:
+            return os.stat(self._config_path).st_mtime_ns
+        except OSError:
+            return None
+
+    def _run(self):
+        while not self._stop_event.wait(self._interval):
+            mtime_ns = self._mtime_ns()
+            if mtime_ns != self._last_mtime_ns:
+                self._last_mtime_ns = mtime_ns
+                try:
+                    self._config.reload()
+                except Exception as e:
+                    logger.error(f"Error reloading config from {self._config_path}: {e}")
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+
 config = Config()
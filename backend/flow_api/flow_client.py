@@ -1,9 +1,19 @@
-import json
-import requests
+import time
+import logging
+import httpx
+import orjson
+from importlib.util import find_spec
 from backend.config.config import config
 from backend.flow_api.endpoints import FlowAPIEndpoints
 from backend.flow_api.models import FlowAccessToken, HealthStatus
 
+logger = logging.getLogger(__name__)
+
+_TOKEN_REFRESH_MARGIN = 30  # seconds before expiry at which a token is renewed
+
+# HTTP/2 needs the optional h2 package (installed by httpx[http2]); fall back to HTTP/1.1 without it
+_HTTP2_AVAILABLE = find_spec("h2") is not None
+
 class FlowAPIClient:
     def __init__(self):
         self.base_url = config.client.base_url
@@ -12,12 +22,17 @@ class FlowAPIClient:
         self.client_secret = config.client.client_secret
         self.app_to_access = config.client.app_to_access
         self.token = None
+        # One pooled client so TLS sessions are reused across auth and health calls.
+        # follow_redirects matches the requests behavior this replaced; httpx defaults to False
+        self._session = httpx.Client(base_url=self.base_url, http2=_HTTP2_AVAILABLE, timeout=10.0,
+                                     follow_redirects=True, headers={"FlowTenant": self.tenant})
+
+    def close(self):
+        self._session.close()
 
     def authenticate(self) -> bool:
-        url = f"{self.base_url}{FlowAPIEndpoints.AUTH_TOKEN}"
         headers = {
-            "Content-Type": "application/json",
-            "FlowTenant": self.tenant
+            "Content-Type": "application/json"
         }
         payload = {
             "clientId": self.client_id,
@@ -25,68 +40,74 @@ class FlowAPIClient:
             "appToAccess": self.app_to_access
         }
         try:
-            print("Authenticating with payload:", payload)
-            response = requests.post(url, data=json.dumps(payload), headers=headers)
+            # Never log the payload itself: it carries clientSecret
+            logger.debug("Authenticating client %s for app %s", self.client_id, self.app_to_access)
+            response = self._session.post(FlowAPIEndpoints.AUTH_TOKEN, content=orjson.dumps(payload), headers=headers)
             response.raise_for_status()
 
             if response.status_code == 200:
-                self.token = FlowAccessToken.from_dict(response.json())
-                print("Authentication successful, token obtained.")
+                self.token = FlowAccessToken.from_dict(orjson.loads(response.content))
+                logger.debug("Authentication successful, token obtained.")
                 return True
             else:
-                print("Authentication failed with status code:", response.status_code, response.text)
+                logger.error("Authentication failed with status code: %s %s", response.status_code, response.text)
             return False
         except Exception as e:
-            print(f"Authentication failed: {e}")
+            logger.error("Authentication failed: %s", e)
             return False
 
+    def _ensure_token(self) -> bool:
+        """Authenticate only when there is no token or it is about to expire."""
+        if (self.token is None or not self.token.access_token
+                or time.time() >= self.token.expiration_timestamp - _TOKEN_REFRESH_MARGIN):
+            return self.authenticate()
+        return True
+
     def check_token_validity(self) -> bool:
-        if self.token is None:
+        if not self._ensure_token():
             return False
 
-        url = f"{self.base_url}/auth-engine-api/v1/health"
         headers = {
             "Authorization": f"Bearer {self.token.access_token}"
         }
 
         try:
-            print("Checking token validity with headers:", headers)
-            response = requests.get(url, headers=headers)
+            logger.debug("Checking token validity")
+            response = self._session.get(FlowAPIEndpoints.AUTH_HEALTH, headers=headers)
             response.raise_for_status()
 
             if response.status_code == 200:
-                print("Token is valid.")
+                logger.debug("Token is valid.")
                 return True
             else:
-                print("Token is invalid with status code:", response.status_code, response.text)
+                logger.warning("Token is invalid with status code: %s %s", response.status_code, response.text)
             return False
         except Exception as e:
-            print(f"Token validity check failed: {e}")
+            logger.error("Token validity check failed: %s", e)
             return False
 
     def health_check(self) -> bool:
-        if not self.authenticate():
+        if not self._ensure_token():
             return False
 
-        url = f"{self.base_url}{FlowAPIEndpoints.LLM_HEALTH}"
         headers = {
             "Authorization": f"Bearer {self.token.access_token}",
             "Content-Type": "application/json"
         }
         try:
-            #print("Performing health check to", url, "with payload:", headers)
-            response = requests.get(url, headers=headers, timeout=5)
+            logger.debug("Performing health check to %s", FlowAPIEndpoints.LLM_HEALTH)
+            response = self._session.get(FlowAPIEndpoints.LLM_HEALTH, headers=headers, timeout=5)
             response.raise_for_status()
 
             if response.status_code == 200:
-                health = HealthStatus.from_dict(response.json())
-                print("Health check successful:", health)
+                health = HealthStatus.from_dict(orjson.loads(response.content))
+                logger.debug("Health check successful: %s", health)
                 return True
             else:
-                print("Health check failed with status code:", response.status_code, response.text)
+                logger.error("Health check failed with status code: %s %s", response.status_code, response.text)
                 return False
         except Exception as e:
-            print(f"Health check failed: {e}")
+            logger.error("Health check failed: %s", e)
             return False
 
 flow_client = FlowAPIClient()
\ No newline at end of file
@@ -1,17 +1,56 @@
+import asyncio
 import logging
+import time
 import requests
-import http.client
-import json
-from typing import Dict, Any, Optional, List
-from dataclasses import dataclass
+from requests.adapters import HTTPAdapter
+import httpx
+import orjson
+from typing import Dict, Any, Optional, List, Tuple, Iterator, AsyncIterator, Union
+from dataclasses import dataclass, replace
 from backend.flow_api.flow_client import flow_client
 from backend.flow_api.models import FlowAPIError, LLMCapabilities, SupportedModel
 from backend.config.config import config
-from urllib.parse import urlparse
 
 logger = logging.getLogger(__name__)
 
-@dataclass
+_MODELS_CACHE_TTL = 300  # seconds before the models list is fetched again
+
+_KNOWN_MODELS = (
+    "gpt-4o", "gpt-4o-mini", "gpt-4.1",
+    "text-embedding-ada-002", "text-embedding-3-small", "text-embedding-3-large"
+)
+_KNOWN_CHAT_MODELS = tuple(model for model in _KNOWN_MODELS if not model.startswith("text-embedding"))
+_FALLBACK_MODELS = tuple(
+    {"name": model, "id": model, "type": "chat" if not model.startswith("text-embedding") else "embedding"}
+    for model in _KNOWN_MODELS
+)
+_PREFERRED_MODELS = ("gpt-4o", "gpt-4o-mini", "gpt-4.1")
+
+_COMPLETION_ENDPOINTS = (
+    "/ai-orchestration-api/v1/openai/chat/completions",
+    "/ai-orchestration-api/v1/chat/completions",
+    "/ai-orchestration-api/v1/openai/completions",
+)
+
+# Top-level keys checked, in order, for non OpenAI-style completion payloads.
+_RESPONSE_KEYS = ("response", "output", "text", "content", "result", "generated_text")
+
+_NO_CONTEXT_MARKER = "No relevant context found."
+
+_PROMPT_WITH_CONTEXT = """Based on the following context, please answer the user's question:
+
+Context:
+{context}
+
+User Question: {user_message}
+
+Please provide a helpful and accurate answer based on the context provided. If the context doesn't contain enough information to answer the question, please say so."""
+
+_PROMPT_WITHOUT_CONTEXT = """User Question: {user_message}
+
+Please provide a helpful answer. Note that no specific context documents were found for this question."""
+
+@dataclass(slots=True)
 class LLMRequest:
     """Request structure for LLM API calls."""
     message: str
@@ -20,8 +59,9 @@ class LLMRequest:
     max_tokens: int = 1000
     temperature: float = 0.7
     agent_name: str = "llm-chatbot-rag"  # Default agent name
+    stream: bool = False  # Request a server-sent event stream instead of a buffered completion
 
-@dataclass
+@dataclass(slots=True)
 class LLMResponse:
     """Response structure from LLM API calls."""
     response: str
@@ -30,6 +70,42 @@ class LLMResponse:
     error_message: Optional[str] = None
     flow_error: Optional[FlowAPIError] = None
 
+_UNION_ERRORS_KEYS = frozenset({"unionErrors"})
+_OPTIONS_KEYS = frozenset({"options"})
+
+def _contains_key(obj: Any, targets: frozenset) -> bool:
+    """Return True as soon as a dict nested anywhere in obj has one of the target keys."""
+    stack = [obj]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, dict):
+            if not targets.isdisjoint(item.keys()):
+                return True
+            stack.extend(item.values())
+        elif isinstance(item, list):
+            stack.extend(item)
+    return False
+
+def _iter_strings(obj: Any) -> Iterator[str]:
+    """Yield every string value nested in obj's dicts and lists."""
+    stack = [obj]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, str):
+            yield item
+        elif isinstance(item, dict):
+            stack.extend(item.values())
+        elif isinstance(item, list):
+            stack.extend(item)
+
+def _sse_delta(data: Union[bytes, str]) -> Optional[str]:
+    """Content of one OpenAI-style stream chunk (the payload of a "data:" line), if any."""
+    choices = orjson.loads(data).get("choices")
+    if choices:
+        choice = choices[0]
+        return (choice.get("delta") or {}).get("content") or choice.get("text")
+    return None
+
 class FlowLLMClient:
     """
     Client for interacting with CI&T Flow LLM APIs with proper error handling.
@@ -40,64 +116,82 @@ class FlowLLMClient:
         self.base_url = config.client.base_url
         self.api_base = f"{self.base_url}/ai-orchestration-api"
         self.capabilities: Optional[LLMCapabilities] = None
+        # Shared session so calls to the Flow host reuse pooled keep-alive connections.
+        self.session = requests.Session()
+        self.session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=0))
         self._models_cache: Optional[List[Dict[str, Any]]] = None
-        self._known_models = [
-            "gpt-4o", "gpt-4o-mini", "gpt-4.1",
-            "text-embedding-ada-002", "text-embedding-3-small", "text-embedding-3-large"
-        ]
-        
+        self._models_cached_at: Optional[float] = None
+        # Lookup structures derived from _models_cache, rebuilt whenever it is refreshed.
+        self._model_names: List[str] = []
+        self._model_name_set: frozenset = frozenset()
+        self._model_names_lower: List[Tuple[str, str]] = []
+        # Headers are rebuilt only when the Flow token changes; keyed by agent name.
+        self._headers_token: Optional[str] = None
+        self._headers_cache: Dict[str, Dict[str, str]] = {}
+        # Completion endpoint that last answered 200, per model; tried first on later calls.
+        self._endpoint_cache: Dict[str, str] = {}
+        # Created on first async use so it binds to the server's event loop.
+        self._async_session: Optional[httpx.AsyncClient] = None
+
+    def _get_async_session(self) -> httpx.AsyncClient:
+        """Pooled AsyncClient for generate_response_async; shared by every request on the loop."""
+        if self._async_session is None:
+            self._async_session = httpx.AsyncClient(
+                timeout=30, limits=httpx.Limits(max_connections=16, max_keepalive_connections=16))
+        return self._async_session
+
+    async def aclose(self):
+        """Close the async connection pool."""
+        if self._async_session is not None:
+            await self._async_session.aclose()
+            self._async_session = None
+
     def _get_headers(self, agent_name: str = "llm-chatbot-rag") -> Dict[str, str]:
         """Get headers with authentication token and required FlowAgent parameter."""
         if not flow_client.token or not flow_client.token.access_token:
             if not flow_client.authenticate():
                 raise Exception("Failed to authenticate with Flow API")
 
-        return {
-            "Authorization": f"Bearer {flow_client.token.access_token}",
-            "Content-Type": "application/json",
-            "Accept": "application/json",
-            "FlowAgent": agent_name  # Required parameter for usage metrics
-        }
+        access_token = flow_client.token.access_token
+        if access_token != self._headers_token:
+            self._headers_token = access_token
+            self._headers_cache.clear()
+
+        headers = self._headers_cache.get(agent_name)
+        if headers is None:
+            headers = self._headers_cache[agent_name] = {
+                "Authorization": f"Bearer {access_token}",
+                "Content-Type": "application/json",
+                "Accept": "application/json",
+                "FlowAgent": agent_name  # Required parameter for usage metrics
+            }
+        return headers
 
     def fetch_available_models(self) -> List[Dict[str, Any]]:
         """
         Fetch available models. If API fails, return known models from error messages.
         """
         try:
-            parsed_url = urlparse(self.base_url)
-            host = parsed_url.netloc
-
-            if not flow_client.token or not flow_client.token.access_token:
-                if not flow_client.authenticate():
-                    raise Exception("Failed to authenticate with Flow API")
-
-            conn = http.client.HTTPSConnection(host)
-            payload = ''
-            headers = {
-                'Accept': 'application/json',
-                'Authorization': f'Bearer {flow_client.token.access_token}',
-                'FlowAgent': 'llm-chatbot-rag'
-            }
+            headers = self._get_headers()
 
-            endpoint = "/ai-orchestration-api/v1/models"
-            logger.info(f"Fetching models from: https://{host}{endpoint}")
+            url = f"{self.api_base}/v1/models"
+            logger.debug("Fetching models from: %s", url)
 
-            conn.request("GET", endpoint, payload, headers)
-            res = conn.getresponse()
-            data = res.read()
+            res = self.session.get(url, headers=headers, timeout=10)
+            data = res.content
 
-            logger.info(f"Models API response: Status={res.status}, Content-Length={len(data)}")
+            logger.debug("Models API response: Status=%s, Content-Length=%s", res.status_code, len(data))
 
-            if res.status == 200:
-                response_text = data.decode("utf-8")
-                logger.info(f"Raw response preview: {response_text[:200]}...")
+            if res.status_code == 200:
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("Raw response preview: %s...", data[:200].decode('utf-8', errors='replace'))
 
-                if not response_text.strip():
+                if not data.strip():
                     logger.warning("Empty response from models API")
                     return self._get_fallback_models()
                 try:
-                    models_data = json.loads(response_text)
-                    logger.info(f"Successfully parsed models JSON: {type(models_data)}")
+                    models_data = orjson.loads(data)
+                    logger.debug("Successfully parsed models JSON: %s", type(models_data))
 
                     if isinstance(models_data, list):
                         self._models_cache = models_data
@@ -113,70 +207,72 @@ class FlowLLMClient:
                     logger.info(f"Cached {len(self._models_cache)} models")
                     return self._models_cache
 
-                except json.JSONDecodeError as e:
+                except orjson.JSONDecodeError as e:
                     logger.error(f"Failed to parse JSON response: {e}")
                     return self._get_fallback_models()
 
-            elif res.status == 401:
+            elif res.status_code == 401:
                 logger.error("Unauthorized access to models API - using known models from error analysis")
                 return self._get_fallback_models()
-            elif res.status == 404:
+            elif res.status_code == 404:
                 logger.error("Models endpoint not found - using known models")
                 return self._get_fallback_models()
             else:
-                response_text = data.decode("utf-8")
-                logger.error(f"Models API failed: {res.status} - {response_text}")
+                logger.error(f"Models API failed: {res.status_code} - {res.text}")
                 return self._get_fallback_models()
         except Exception as e:
             logger.error(f"Error fetching available models: {e}")
             return self._get_fallback_models()
-        finally:
-            try:
-                conn.close()
-            except:
-                pass
 
     def _get_fallback_models(self) -> List[Dict[str, Any]]:
         """Get fallback models based on the 409 error analysis."""
-        return [
-            {"name": model, "id": model, "type": "chat" if not model.startswith("text-embedding") else "embedding"}
-            for model in self._known_models
-        ]
+        return list(_FALLBACK_MODELS)
 
-    def get_available_models(self) -> List[str]:
-        """Get list of available model names."""
-        if not self._models_cache:
-            models_data = self.fetch_available_models()
-        else:
-            models_data = self._models_cache
+    def _get_models_data(self) -> List[Dict[str, Any]]:
+        """Return the cached models, fetching them again once the cache has expired."""
+        if (self._models_cache is None or self._models_cached_at is None or
+                time.monotonic() - self._models_cached_at > _MODELS_CACHE_TTL):
+            self._models_cache = self.fetch_available_models()
+            self._models_cached_at = time.monotonic()
+            self._index_model_names(self._models_cache)
+        return self._models_cache
 
+    def _index_model_names(self, models_data: List[Dict[str, Any]]):
+        """Precompute the chat model names and their lookup structures."""
         if not models_data:
             logger.info("Using known models from API error analysis")
-            return [model for model in self._known_models if not model.startswith("text-embedding")]
-
-        model_names = []
-        for model in models_data:
-            if isinstance(model, dict):
-                name = (model.get('name') or
-                       model.get('id') or
-                       model.get('model') or
-                       model.get('modelName') or
-                       model.get('model_name') or
-                       model.get('identifier') or
-                       model.get('modelId'))
-                if name and not name.startswith("text-embedding"):
-                    model_names.append(str(name))
-            elif isinstance(model, str) and not model.startswith("text-embedding"):
-                model_names.append(model)
-
-        return model_names if model_names else ["gpt-4o"]
+            model_names = list(_KNOWN_CHAT_MODELS)
+        else:
+            model_names = []
+            for model in models_data:
+                if isinstance(model, dict):
+                    name = (model.get('name') or
+                           model.get('id') or
+                           model.get('model') or
+                           model.get('modelName') or
+                           model.get('model_name') or
+                           model.get('identifier') or
+                           model.get('modelId'))
+                    if name and not name.startswith("text-embedding"):
+                        model_names.append(str(name))
+                elif isinstance(model, str) and not model.startswith("text-embedding"):
+                    model_names.append(model)
+
+            if not model_names:
+                model_names = ["gpt-4o"]
+
+        self._model_names = model_names
+        self._model_name_set = frozenset(model_names)
+        self._model_names_lower = [(name.lower(), name) for name in model_names]
+
+    def get_available_models(self) -> List[str]:
+        """Get list of available model names."""
+        self._get_models_data()
+        return self._model_names
 
     def get_models_details(self) -> List[Dict[str, Any]]:
         """Get detailed information about available models."""
-        if not self._models_cache:
-            self._models_cache = self.fetch_available_models()
-
-        return self._models_cache or []
+        return self._get_models_data() or []
 
     def get_default_model(self) -> str:
         """Get the default model to use based on known working models."""
@@ -185,16 +281,12 @@ class FlowLLMClient:
         if not available_models:
             return "gpt-4o"
 
-        preferred_models = [
-            "gpt-4o", "gpt-4o-mini", "gpt-4.1"
-        ]
-
-        for preferred in preferred_models:
-            if preferred in available_models:
-                logger.info(f"Selected default model: {preferred}")
+        for preferred in _PREFERRED_MODELS:
+            if preferred in self._model_name_set:
+                logger.debug("Selected default model: %s", preferred)
                 return preferred
 
-        logger.info(f"Using first available model: {available_models[0]}")
+        logger.debug("Using first available model: %s", available_models[0])
         return available_models[0]
 
     def _select_model(self, requested_model: Optional[str] = None) -> str:
@@ -202,93 +294,213 @@ class FlowLLMClient:
         available_models = self.get_available_models()
 
         if requested_model:
-            if requested_model in available_models:
-                logger.info(f"Using exact model match: {requested_model}")
+            if requested_model in self._model_name_set:
+                logger.debug("Using exact model match: %s", requested_model)
                 return requested_model
 
-            for model in available_models:
-                if (requested_model.lower() in model.lower() or
-                    model.lower() in requested_model.lower()):
-                    logger.info(f"Using partial model match: {model} for requested {requested_model}")
+            requested_lower = requested_model.lower()
+            for model_lower, model in self._model_names_lower:
+                if requested_lower in model_lower or model_lower in requested_lower:
+                    logger.debug("Using partial model match: %s for requested %s", model, requested_model)
                     return model
 
             logger.warning(f"Requested model '{requested_model}' not available. Available models: {available_models}")
 
         default_model = self.get_default_model()
-        logger.info(f"Using default model: {default_model}")
+        logger.debug("Using default model: %s", default_model)
         return default_model
 
+    def _build_request_body(self, llm_request: LLMRequest, selected_model: str) -> bytes:
+        """Serialize the chat completion payload for a request."""
+        prompt = self._construct_prompt(llm_request.message, llm_request.context)
+        payload = {
+            "model": selected_model,
+            "messages": [
+                {
+                    "role": "system",
+                    "content": "You are a helpful assistant that answers questions based on the provided context."
+                },
+                {
+                    "role": "user",
+                    "content": prompt
+                }
+            ],
+            "max_tokens": llm_request.max_tokens,
+            "temperature": llm_request.temperature
+        }
+        if llm_request.stream:
+            payload["stream"] = True
+        return orjson.dumps(payload)
+
+    def _handle_completion_response(self, response: Union[requests.Response, httpx.Response], endpoint: str,
+                                    selected_model: str, stream: bool) -> LLMResponse:
+        """Convert a non-404 completion response, remembering endpoints that answer 200."""
+        if response.status_code == 200:
+            self._endpoint_cache[selected_model] = endpoint
+            if stream:
+                return self._parse_stream_response(response, selected_model)
+            return self._parse_success_response(orjson.loads(response.content), selected_model)
+        elif response.status_code == 409:
+            error_response = orjson.loads(response.content)
+            logger.error(f"Schema validation error: {error_response}")
+
+            if _contains_key(error_response, _UNION_ERRORS_KEYS):
+                self._extract_models_from_error(error_response)
+
+            return self._handle_error_response(response)
+        elif response.status_code in [400, 422]:
+            logger.warning(f"Client error {response.status_code} for {endpoint}: {response.text[:200]}")
+            return self._handle_error_response(response)
+        else:
+            logger.warning(f"Error {response.status_code} for {endpoint}: {response.text[:200]}")
+            return self._handle_error_response(response)
+
     def generate_response(self, llm_request: LLMRequest) -> LLMResponse:
         """
         Generate a response using the CI&T Flow LLM API with proper error handling.
         Uses the documented endpoints from the Flow API documentation.
         """
         selected_model = self._select_model(llm_request.model)
+        return self._generate_sequential(llm_request, selected_model)
+
+    async def generate_response_async(self, llm_request: LLMRequest) -> LLMResponse:
+        """
+        Async variant of generate_response for callers already running an event loop.
+        Completion calls go through httpx.AsyncClient, so waiting on the LLM holds no thread.
+        """
+        selected_model = await asyncio.to_thread(self._select_model, llm_request.model)
+        return await self._generate_async(llm_request, selected_model)
+
+    async def _post_async(self, endpoint: str, body: bytes, headers: Dict[str, str],
+                          stream: bool) -> Optional[httpx.Response]:
+        """POST a completion request; the body is left unread when streaming."""
+        url = f"{self.base_url}{endpoint}"
+        logger.debug("Trying endpoint: %s", url)
+        client = self._get_async_session()
         try:
-            prompt = self._construct_prompt(llm_request.message, llm_request.context)
+            request = client.build_request("POST", url, content=body, headers=headers)
+            return await client.send(request, stream=stream)
+        except httpx.HTTPError as e:
+            logger.warning(f"Request failed for {url}: {e}")
+            return None
+
+    async def _finish_async(self, response: httpx.Response, endpoint: str,
+                            selected_model: str, stream: bool) -> LLMResponse:
+        """Async counterpart of _handle_completion_response."""
+        if stream:
+            if response.status_code == 200:
+                self._endpoint_cache[selected_model] = endpoint
+                return await self._parse_stream_response_async(response, selected_model)
+            await response.aread()  # error bodies are small; read them for the error parser
+        return self._handle_completion_response(response, endpoint, selected_model, False)
+
+    def _endpoint_order(self, selected_model: str) -> List[str]:
+        """Completion endpoints in the order to try them: the one cached for selected_model first."""
+        cached_endpoint = self._endpoint_cache.get(selected_model)
+        if not cached_endpoint:
+            return list(_COMPLETION_ENDPOINTS)
+        return [cached_endpoint] + [e for e in _COMPLETION_ENDPOINTS if e != cached_endpoint]
+
+    def _forget_endpoint(self, selected_model: str, endpoint: str):
+        """Drop a cached endpoint that answered 404 so later calls stop trying it first."""
+        logger.debug("404 for %s, trying next endpoint...", endpoint)
+        if self._endpoint_cache.get(selected_model) == endpoint:
+            self._endpoint_cache.pop(selected_model, None)
+
+    async def _open_completion_async(self, selected_model: str, body: bytes, headers: Dict[str, str],
+                                     stream: bool) -> Tuple[Optional[str], Optional[httpx.Response]]:
+        """
+        POST to the endpoints in _endpoint_order until one answers with something other than 404.
+        Returns that endpoint and its (open) response, or (None, None) if every endpoint failed.
+        """
+        for endpoint in self._endpoint_order(selected_model):
+            response = await self._post_async(endpoint, body, headers, stream)
+            if response is None:
+                continue
+            logger.debug("Response status for %s: %s", endpoint, response.status_code)
+            if response.status_code == 404:
+                await response.aclose()
+                self._forget_endpoint(selected_model, endpoint)
+                continue
+            return endpoint, response
+        return None, None
+
+    async def _generate_async(self, llm_request: LLMRequest, selected_model: str) -> LLMResponse:
+        """Native-async completion; endpoints are tried in the same order as the sync path."""
+        try:
+            # May authenticate through the blocking Flow client
+            headers = await asyncio.to_thread(self._get_headers, llm_request.agent_name)
+            body = self._build_request_body(llm_request, selected_model)
+
+            endpoint, response = await self._open_completion_async(selected_model, body, headers,
+                                                                   llm_request.stream)
+            if response is None:
+                return self._all_endpoints_failed(selected_model)
+            return await self._finish_async(response, endpoint, selected_model, llm_request.stream)
 
-            endpoints_to_try = [
-                "/ai-orchestration-api/v1/openai/chat/completions",
-                "/ai-orchestration-api/v1/chat/completions",
-                "/ai-orchestration-api/v1/openai/completions",
-            ]
+        except Exception as e:
+            logger.error(f"Error calling LLM API: {e}")
+            return LLMResponse(
+                response="",
+                success=False,
+                error_message=str(e),
+                model_used=selected_model
+            )
+
+    async def stream_response(self, llm_request: LLMRequest) -> AsyncIterator[str]:
+        """
+        Stream the completion for llm_request, yielding content deltas as the LLM produces them.
+        Endpoints are tried in the same order as generate_response; if none of them accepts the
+        request an Exception carrying the API error message is raised before anything is yielded.
+        """
+        selected_model = await asyncio.to_thread(self._select_model, llm_request.model)
+        headers = await asyncio.to_thread(self._get_headers, llm_request.agent_name)
+        body = self._build_request_body(replace(llm_request, stream=True), selected_model)
+
+        endpoint, response = await self._open_completion_async(selected_model, body, headers, True)
+        if response is None:
+            raise Exception(self._all_endpoints_failed(selected_model).error_message)
+
+        if response.status_code != 200:
+            await response.aread()
+            raise Exception(self._handle_completion_response(
+                response, endpoint, selected_model, False).error_message)
+
+        self._endpoint_cache[selected_model] = endpoint
+        try:
+            async for content in self._aiter_stream_deltas(response):
+                yield content
+        finally:
+            await response.aclose()
+
+    def _generate_sequential(self, llm_request: LLMRequest, selected_model: str) -> LLMResponse:
+        """Try the completion endpoints one at a time, in _endpoint_order."""
+        try:
             headers = self._get_headers(llm_request.agent_name)
+            body = self._build_request_body(llm_request, selected_model)
 
-            for endpoint in endpoints_to_try:
+            for endpoint in self._endpoint_order(selected_model):
                 url = f"{self.base_url}{endpoint}"
 
-                payload = {
-                    "model": selected_model,
-                    "messages": [
-                        {
-                            "role": "system",
-                            "content": "You are a helpful assistant that answers questions based on the provided context."
-                        },
-                        {
-                            "role": "user",
-                            "content": prompt
-                        }
-                    ],
-                    "max_tokens": llm_request.max_tokens,
-                    "temperature": llm_request.temperature
-                }
-
                 try:
-                    logger.info(f"Trying endpoint: {url} with model: {selected_model}")
-                    response = requests.post(url, json=payload, headers=headers, timeout=30)
+                    logger.debug("Trying endpoint: %s with model: %s", url, selected_model)
+                    response = self.session.post(url, data=body, headers=headers, timeout=30,
+                                                 stream=llm_request.stream)
 
-                    logger.info(f"Response status: {response.status_code}")
+                    logger.debug("Response status: %s", response.status_code)
 
-                    if response.status_code == 200:
-                        return self._parse_success_response(response.json(), selected_model)
-                    elif response.status_code == 404:
-                        logger.debug(f"404 for {endpoint}, trying next endpoint...")
+                    if response.status_code == 404:
+                        response.close()
+                        self._forget_endpoint(selected_model, endpoint)
                         continue
-                    elif response.status_code == 409:
-                        error_response = response.json()
-                        logger.error(f"Schema validation error: {error_response}")
 
-                        if "unionErrors" in str(error_response):
-                            self._extract_models_from_error(error_response)
-
-                        return self._handle_error_response(response)
-                    elif response.status_code in [400, 422]:
-                        logger.warning(f"Client error {response.status_code} for {endpoint}: {response.text[:200]}")
-                        return self._handle_error_response(response)
-                    else:
-                        logger.warning(f"Error {response.status_code} for {endpoint}: {response.text[:200]}")
-                        return self._handle_error_response(response)
+                    return self._handle_completion_response(response, endpoint, selected_model, llm_request.stream)
 
                 except requests.exceptions.RequestException as e:
                     logger.warning(f"Request failed for {url}: {e}")
                     continue
 
-            return LLMResponse(
-                response="",
-                success=False,
-                error_message="All API endpoints failed. The LLM service may be unavailable or the model may not be supported.",
-                model_used=selected_model
-            )
+            return self._all_endpoints_failed(selected_model)
 
         except Exception as e:
             logger.error(f"Error calling LLM API: {e}")
@@ -299,11 +511,19 @@ class FlowLLMClient:
                 model_used=selected_model
             )
 
+    def _all_endpoints_failed(self, selected_model: str) -> LLMResponse:
+        return LLMResponse(
+            response="",
+            success=False,
+            error_message="All API endpoints failed. The LLM service may be unavailable or the model may not be supported.",
+            model_used=selected_model
+        )
+
     def _extract_models_from_error(self, error_response: Dict[str, Any]):
         """Extract available models from 409 error response."""
         try:
-            error_str = str(error_response)
-            if "options" in error_str and "gpt-4o" in error_str:
+            if (_contains_key(error_response, _OPTIONS_KEYS) and
+                    any("gpt-4o" in value for value in _iter_strings(error_response))):
                 logger.info("Updated known models from API error response")
         except Exception as e:
             logger.debug(f"Could not extract models from error: {e}")
@@ -311,36 +531,17 @@ class FlowLLMClient:
     def _parse_success_response(self, response_data: Dict[str, Any], model_used: str) -> LLMResponse:
         """Parse a successful response from the LLM API."""
         try:
-            logger.info(f"Parsing response with keys: {list(response_data.keys())}")
-
-            response_text = ""
-
-            if "choices" in response_data and len(response_data["choices"]) > 0:
-                choice = response_data["choices"][0]
-                if "message" in choice and "content" in choice["message"]:
-                    response_text = choice["message"]["content"]
-                elif "text" in choice:
-                    response_text = choice["text"]
-                logger.info("Used OpenAI-style response format")
-
-            elif "response" in response_data:
-                response_text = response_data["response"]
-                logger.info("Used direct response format")
-            elif "output" in response_data:
-                response_text = response_data["output"]
-                logger.info("Used output format")
-            elif "text" in response_data:
-                response_text = response_data["text"]
-                logger.info("Used text format")
-            elif "content" in response_data:
-                response_text = response_data["content"]
-                logger.info("Used content format")
-            elif "result" in response_data:
-                response_text = response_data["result"]
-                logger.info("Used result format")
-            elif "generated_text" in response_data:
-                response_text = response_data["generated_text"]
-                logger.info("Used generated_text format")
+            logger.debug("Parsing response with keys: %s", response_data.keys())
+
+            choices = response_data.get("choices")
+            if choices:
+                choice = choices[0]
+                response_text = (choice.get("message") or {}).get("content") or choice.get("text", "")
+                logger.debug("Used OpenAI-style response format")
+            else:
+                response_key = next((key for key in _RESPONSE_KEYS if key in response_data), None)
+                response_text = response_data[response_key] if response_key else ""
+                logger.debug("Used %s response format", response_key)
 
             if response_text:
                 return LLMResponse(
@@ -367,10 +568,83 @@ class FlowLLMClient:
                 model_used=model_used
             )
 
-    def _handle_error_response(self, response: requests.Response) -> LLMResponse:
+    def _parse_stream_response(self, response: requests.Response, model_used: str) -> LLMResponse:
+        """
+        Parse an OpenAI-style server-sent event stream, accumulating content deltas
+        as the lines arrive instead of buffering and decoding the whole body.
+        """
+        try:
+            parts = []
+            for line in response.iter_lines():
+                if not line.startswith(b"data:"):
+                    continue
+                data = line[5:].strip()
+                if data == b"[DONE]":
+                    break
+
+                content = _sse_delta(data)
+                if content:
+                    parts.append(content)
+
+            return self._stream_result("".join(parts), model_used)
+
+        except Exception as e:
+            logger.error(f"Error parsing streamed response: {e}")
+            return self._stream_error(e, model_used)
+        finally:
+            response.close()
+
+    async def _aiter_stream_deltas(self, response: httpx.Response) -> AsyncIterator[str]:
+        """Yield the content deltas of an OpenAI-style event stream as the lines arrive."""
+        async for line in response.aiter_lines():
+            if not line.startswith("data:"):
+                continue
+            data = line[5:].strip()
+            if data == "[DONE]":
+                break
+
+            content = _sse_delta(data)
+            if content:
+                yield content
+
+    async def _parse_stream_response_async(self, response: httpx.Response, model_used: str) -> LLMResponse:
+        """Async counterpart of _parse_stream_response for httpx streaming responses."""
+        try:
+            parts = [content async for content in self._aiter_stream_deltas(response)]
+            return self._stream_result("".join(parts), model_used)
+
+        except Exception as e:
+            logger.error(f"Error parsing streamed response: {e}")
+            return self._stream_error(e, model_used)
+        finally:
+            await response.aclose()
+
+    def _stream_result(self, response_text: str, model_used: str) -> LLMResponse:
+        if response_text:
+            return LLMResponse(
+                response=response_text.strip(),
+                success=True,
+                model_used=model_used
+            )
+        return LLMResponse(
+            response="",
+            success=False,
+            error_message="Could not extract response text from streamed API response",
+            model_used=model_used
+        )
+
+    def _stream_error(self, error: Exception, model_used: str) -> LLMResponse:
+        return LLMResponse(
+            response="",
+            success=False,
+            error_message=f"Error parsing streamed API response: {error}",
+            model_used=model_used
+        )
+
+    def _handle_error_response(self, response: Union[requests.Response, httpx.Response]) -> LLMResponse:
         """Handle error responses from the API."""
         try:
-            error_data = response.json()
+            error_data = orjson.loads(response.content)
             flow_error = FlowAPIError.from_response(error_data, response.status_code)
 
             return LLMResponse(
@@ -390,21 +664,9 @@ class FlowLLMClient:
         """
         Construct a prompt that includes both the user message and retrieved context.
         """
-        if context and context.strip() != "No relevant context found.":
-            prompt = f"""Based on the following context, please answer the user's question:
-
-Context:
-{context}
-
-User Question: {user_message}
-
-Please provide a helpful and accurate answer based on the context provided. If the context doesn't contain enough information to answer the question, please say so."""
-        else:
-            prompt = f"""User Question: {user_message}
-
-Please provide a helpful answer. Note that no specific context documents were found for this question."""
-
-        return prompt
+        if context and context.strip() != _NO_CONTEXT_MARKER:
+            return _PROMPT_WITH_CONTEXT.format(context=context, user_message=user_message)
+        return _PROMPT_WITHOUT_CONTEXT.format(user_message=user_message)
 
     def health_check(self) -> bool:
         """Check if the LLM service is available."""
@@ -418,7 +680,7 @@ Please provide a helpful answer. Note that no specific context documents were fo
                 "max_tokens": 1
             }
 
-            response = requests.post(health_url, json=test_payload, headers=headers, timeout=10)
+            response = self.session.post(health_url, data=orjson.dumps(test_payload), headers=headers, timeout=10)
             return response.status_code in [200, 400, 409]
         except:
             return False
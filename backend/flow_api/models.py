@@ -2,8 +2,9 @@ from dataclasses import dataclass
 from typing import Optional, Dict, Any, List
 from datetime import datetime
 import json
+import time
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class FlowAccessToken:
     access_token: str
     expires_in: int
@@ -14,14 +15,14 @@ class FlowAccessToken:
         return cls(
             access_token=data.get("access_token", ""),
             expires_in=data.get("expires_in", 0),
-            expiration_timestamp=datetime.now().timestamp() + data.get("expires_in", 0)
+            expiration_timestamp=time.time() + data.get("expires_in", 0)
         )
     
     @classmethod
     def empty(cls):
         return cls(access_token="", expires_in=0)
     
-@dataclass
+@dataclass(slots=True, frozen=True)
 class HealthStatus:
     result: str
     timestamp: str
@@ -37,7 +38,7 @@ class HealthStatus:
     def empty(cls):
         return cls(result="", timestamp="")
 
-@dataclass
+@dataclass(slots=True)
 class FlowAPIError:
     """Represents an error response from Flow API."""
     timestamp: str
@@ -50,7 +51,7 @@ class FlowAPIError:
     def from_response(cls, response_data: Dict[str, Any], status_code: int) -> 'FlowAPIError':
         """Create FlowAPIError from API response."""
         return cls(
-            timestamp=response_data.get("timestamp", datetime.now().isoformat()),
+            timestamp=response_data.get("timestamp") or datetime.now().isoformat(),
             path=response_data.get("path", "unknown"),
             message=response_data.get("message", "Unknown error"),
             error=response_data.get("error", "API Error"),
@@ -60,7 +61,7 @@ class FlowAPIError:
     def __str__(self) -> str:
         return f"FlowAPIError({self.status_code}): {self.message} at {self.path}"
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class SupportedModel:
     """Represents a supported LLM model."""
     name: str
@@ -68,7 +69,7 @@ class SupportedModel:
     max_tokens: int
     supports_streaming: bool = False
 
-@dataclass
+@dataclass(slots=True)
 class LLMCapabilities:
     """Represents the capabilities of the LLM service."""
     supported_models: List[SupportedModel]
@@ -1,18 +1,29 @@
 from fastapi import FastAPI, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
+import asyncio
+import functools
 import logging
-from typing import Dict, Any, Optional
+import orjson
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, AsyncIterator
 import os
-from backend.config.config import config
+from backend.config.config import RagConfig, config
 from backend.rag.loader import RagLoader
 from backend.rag.rag_service import RAGService
 from backend.flow_api.llm_client import llm_client, LLMRequest
 from backend.flow_api.flow_client import flow_client
-from backend.api.chat_models import ChatMessage, ChatResponse, RAGStats
+from backend.api.chat_models import ChatMessage, ChatResponse, ContextPreview, RAGStats
 from datetime import datetime
 
 
-rag_service = RAGService()
+rag_service = RAGService(embedding_model=config.rag.embedding_model,
+                         quantized_search=config.rag.quantized_search,
+                         ann_search=config.rag.ann_search)
+# Retrieval gets its own pool so similarity searches never queue behind other blocking work
+# in the default to_thread pool; threads suffice because the NumPy/BLAS kernels release the GIL.
+_retrieval_executor = ThreadPoolExecutor(max_workers=os.cpu_count() or 1, thread_name_prefix="rag-retrieval")
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
@@ -21,15 +32,61 @@ logger = logging.getLogger(__name__)
 # Initialize FastAPI app
 app = FastAPI(title="CI&T Flow API Integration with RAG")
 
+# Response timestamps only need second resolution, so one ISO string is shared per second
+_TIMESTAMP_REFRESH_INTERVAL = 1.0
+_app_state: Dict[str, Any] = {"now_iso": datetime.now().isoformat(), "now_at": time.monotonic()}
+
+def _refresh_timestamp():
+    _app_state["now_iso"] = datetime.now().isoformat()
+    _app_state["now_at"] = time.monotonic()
+
+def _now_iso() -> str:
+    """Cached datetime.now().isoformat(); refreshed inline if the ticker task isn't running."""
+    if time.monotonic() - _app_state["now_at"] > 2 * _TIMESTAMP_REFRESH_INTERVAL:
+        _refresh_timestamp()
+    return _app_state["now_iso"]
+
+async def _tick_timestamp():
+    while True:
+        _refresh_timestamp()
+        await asyncio.sleep(_TIMESTAMP_REFRESH_INTERVAL)
+
+@app.on_event("startup")
+async def start_timestamp_ticker():
+    _app_state["ticker"] = asyncio.create_task(_tick_timestamp())
+
+@app.on_event("startup")
+async def load_persisted_documents():
+    index_path = config.rag.index_path
+    if index_path and await asyncio.to_thread(os.path.exists, index_path + ".npy"):
+        await asyncio.to_thread(rag_service.load, index_path)
+
+@app.on_event("startup")
+async def warm_up_rag():
+    # Runs after load_persisted_documents, so a loaded store gets searched once too
+    try:
+        await asyncio.to_thread(rag_service.warmup)
+    except Exception as e:
+        logger.warning(f"RAG warmup failed: {e}")
+
+@app.on_event("shutdown")
+async def close_clients():
+    ticker = _app_state.pop("ticker", None)
+    if ticker is not None:
+        ticker.cancel()
+    flow_client.close()
+    await llm_client.aclose()
+    _retrieval_executor.shutdown(wait=False)
+
 @app.get("/", summary="Health Check Endpoint")
-def read_root():
+async def read_root():
     return {"message": "CI&T Flow API Integration with RAG is running."}
 
 @app.get("/health", summary="Check API Health")
-def health():
+async def health():
     try:
         # Uncomment when flow_client is available
-        if flow_client.health_check():
+        if await asyncio.to_thread(flow_client.health_check):
             return {"status": 200, "message": "Connected to CI&T Flow API successfully"}
         return {"status": "ok", "message": "Backend is running"}
     except Exception as e:
@@ -37,7 +94,7 @@ def health():
         return {"status": "error", "message": "Health check failed"}
 
 @app.get("/models", summary="Get Available Models")
-def get_available_models():
+async def get_available_models():
     try:
         # Uncomment when llm_client is available
         # models_details = llm_client.get_models_details()
@@ -65,7 +122,7 @@ def get_available_models():
         }
 
 @app.post("/models/refresh", summary="Refresh Models Cache")
-def refresh_models():
+async def refresh_models():
     try:
         # Uncomment when llm_client is available
         # llm_client._models_cache = None
@@ -88,24 +145,33 @@ def refresh_models():
         }
 
 
+def _load_documents(folder_path: str, rag: RagConfig):
+    """Blocking part of /load_documents: read the folder with the configured loader settings."""
+    rag_loader = RagLoader(
+        folder_path=folder_path,
+        recurse=rag.recurse_folders,
+        supported_file_types=rag.supported_file_types,
+        pdf_backend=rag.pdf_backend,
+        hash_cache_path=rag.hash_cache_path or None
+    )
+    try:
+        return rag_loader.load_documents_from_folder(compute_hash=rag.compute_hashes)
+    finally:
+        rag_loader.close()
+
 @app.get("/load_documents", summary="Load RAG Documents from Folder")
-def load_documents_endpoint():
-    folder_path = config.rag.documents_path
+async def load_documents_endpoint():
+    rag = config.rag  # one snapshot for the whole request, even if the config is reloaded
+    folder_path = rag.documents_path
     logger.info(f"Loading documents from: {folder_path}")
 
-    if not folder_path or not os.path.isdir(folder_path):
+    if not folder_path or not await asyncio.to_thread(os.path.isdir, folder_path):
         error_msg = f"Invalid document folder path in config: {folder_path}"
         logger.error(error_msg)
         raise HTTPException(status_code=400, detail=error_msg)
 
     try:
-        rag_loader = RagLoader(
-            folder_path=folder_path,
-            recurse=config.rag.recurse_folders,
-            supported_file_types=config.rag.supported_file_types
-        )
-
-        documents = rag_loader.load_documents_from_folder()
+        documents = await asyncio.to_thread(_load_documents, folder_path, rag)
 
         if not documents:
             logger.warning("No documents found in the specified folder")
@@ -116,7 +182,9 @@ def load_documents_endpoint():
                 "rag_initialized": False
             }
 
-        rag_initialized = rag_service.initialize_with_documents(documents)
+        rag_initialized = await asyncio.to_thread(rag_service.initialize_with_documents, documents)
+        if rag_initialized and rag.index_path:
+            await asyncio.to_thread(rag_service.persist, rag.index_path)
 
         document_summaries = [
             {
@@ -142,7 +210,7 @@ def load_documents_endpoint():
         raise HTTPException(status_code=500, detail=f"Failed to load documents: {str(e)}")
     
 @app.post("/chat", summary="Send message to RAG-enabled chatbot")
-def chat_endpoint(chat_message: ChatMessage) -> ChatResponse:
+async def chat_endpoint(chat_message: ChatMessage) -> ChatResponse:
     try:
         if not rag_service.is_initialized:
             return ChatResponse(
@@ -154,31 +222,11 @@ def chat_endpoint(chat_message: ChatMessage) -> ChatResponse:
 
         logger.info(f"Processing chat message: {chat_message.message[:100]}...")
 
-        similarity_results = rag_service.retrieve_relevant_context(
-            chat_message.message,
-            top_k=chat_message.top_k_documents
-        )
-
-        context = rag_service.format_context_for_llm(similarity_results)
-
-        llm_request = LLMRequest(
-            message=chat_message.message,
-            context=context,
-            model=chat_message.model,
-            max_tokens=chat_message.max_tokens,
-            temperature=chat_message.temperature
-        )
+        similarity_results, context = await _retrieve(chat_message)
 
-        llm_response = llm_client.generate_response(llm_request)
+        llm_response = await llm_client.generate_response_async(_build_llm_request(chat_message, context))
 
-        context_used = [
-            {
-                "file_name": result.document.metadata.file_name,
-                "similarity_score": result.similarity_score,
-                "content_preview": result.document.content[:200] + "..." if len(result.document.content) > 200 else result.document.content
-            }
-            for result in similarity_results
-        ]
+        context_used = _context_used(similarity_results)
 
         if not llm_response.success:
             error_details = llm_response.error_message
@@ -197,7 +245,7 @@ def chat_endpoint(chat_message: ChatMessage) -> ChatResponse:
                 metadata={
                     "documents_retrieved": len(similarity_results),
                     "query_length": len(chat_message.message),
-                    "timestamp": datetime.now().isoformat(),
+                    "timestamp": _now_iso(),
                     "model_requested": chat_message.model,
                     "model_used": llm_response.model_used,
                     "fallback_used": True
@@ -212,7 +260,7 @@ def chat_endpoint(chat_message: ChatMessage) -> ChatResponse:
             metadata={
                 "documents_retrieved": len(similarity_results),
                 "query_length": len(chat_message.message),
-                "timestamp": datetime.now().isoformat(),
+                "timestamp": _now_iso(),
                 "model_requested": chat_message.model,
                 "model_used": llm_response.model_used
             }
@@ -227,6 +275,89 @@ def chat_endpoint(chat_message: ChatMessage) -> ChatResponse:
             error_message=str(e)
         )
 
+def _retrieve_and_format(message: str, top_k: int):
+    similarity_results = rag_service.retrieve_relevant_context(message, top_k=top_k)
+    return similarity_results, rag_service.format_context_for_llm(similarity_results)
+
+async def _retrieve(chat_message: ChatMessage):
+    """
+    Run the similarity search for a chat message on the retrieval pool and format the LLM
+    context in the same job, so neither step runs on the event loop.
+    Returns (similarity_results, context).
+    """
+    return await asyncio.get_running_loop().run_in_executor(
+        _retrieval_executor,
+        functools.partial(_retrieve_and_format, chat_message.message, chat_message.top_k_documents)
+    )
+
+def _build_llm_request(chat_message: ChatMessage, context: str) -> LLMRequest:
+    return LLMRequest(
+        message=chat_message.message,
+        context=context,
+        model=chat_message.model,
+        max_tokens=chat_message.max_tokens,
+        temperature=chat_message.temperature
+    )
+
+def _context_used(similarity_results) -> List[ContextPreview]:
+    # The fields come straight from our own documents, so validation is skipped
+    return [
+        ContextPreview.model_construct(
+            file_name=result.document.metadata.file_name,
+            similarity_score=result.similarity_score,
+            content_preview=result.document.content_preview
+        )
+        for result in similarity_results
+    ]
+
+def _sse_event(data: Any, event: Optional[str] = None) -> bytes:
+    """Encode one server-sent event; data is JSON so newlines in tokens can't break the framing."""
+    payload = b"data: " + orjson.dumps(data) + b"\n\n"
+    return b"event: " + event.encode() + b"\n" + payload if event else payload
+
+async def _chat_event_stream(chat_message: ChatMessage) -> AsyncIterator[bytes]:
+    """
+    Events of /chat/stream: "context" with the retrieved documents, unnamed events carrying
+    response text deltas, then "done" with request metadata or "error" if the LLM call failed.
+    """
+    if not rag_service.is_initialized:
+        yield _sse_event({"error_message": "RAG service not initialized"}, "error")
+        return
+
+    try:
+        logger.info(f"Processing streamed chat message: {chat_message.message[:100]}...")
+
+        similarity_results, context = await _retrieve(chat_message)
+        yield _sse_event([preview.model_dump() for preview in _context_used(similarity_results)], "context")
+
+        streamed_any = False
+        try:
+            async for delta in llm_client.stream_response(_build_llm_request(chat_message, context)):
+                streamed_any = True
+                yield _sse_event(delta)
+        except Exception as e:
+            logger.error(f"LLM stream failed: {e}")
+            if not streamed_any:
+                yield _sse_event(_generate_fallback_response(context, chat_message.message))
+            yield _sse_event({"error_message": str(e), "fallback_used": not streamed_any}, "error")
+            return
+
+        yield _sse_event({
+            "documents_retrieved": len(similarity_results),
+            "query_length": len(chat_message.message),
+            "timestamp": _now_iso(),
+            "model_requested": chat_message.model
+        }, "done")
+
+    except Exception as e:
+        logger.error(f"Error in chat stream: {e}")
+        yield _sse_event({"error_message": str(e)}, "error")
+
+@app.post("/chat/stream", summary="Stream the RAG-enabled chatbot's answer as server-sent events")
+async def chat_stream_endpoint(chat_message: ChatMessage):
+    return StreamingResponse(_chat_event_stream(chat_message), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
 def _generate_fallback_response(context: str, user_message: str) -> str:
     if context and context.strip() != "No relevant context found.":
         return f"""I found some relevant information in the documents, but I'm currently unable to process it through the AI service.
@@ -240,50 +371,84 @@ Please try again later or contact support if the issue persists."""
         return f"""I apologize, but I'm currently unable to process your question "{user_message}" due to a service issue. Please try again later or contact support if the issue persists."""
 
 @app.get("/rag/stats", summary="Get RAG service statistics", response_model=RAGStats)
-def get_rag_stats():
+async def get_rag_stats():
     try:
         stats = rag_service.get_stats()
         return RAGStats(
             is_initialized=stats["is_initialized"],
             total_documents=stats["total_documents"],
             embedding_dimension=stats["embedding_dimension"],
-            last_updated=datetime.now().isoformat()
+            last_updated=_now_iso()
         )
     except Exception as e:
         logger.error(f"Error getting RAG stats: {e}")
         raise HTTPException(status_code=500, detail="Failed to get RAG statistics")
 
+# Last /documents/stats result and the folder signature it was computed for
+_stats_cache: Dict[str, Any] = {"key": None, "value": None}
+
+def _document_stats_signature(folder_path: str, recurse: bool) -> tuple:
+    """
+    Cheap change detector for the stats folder: adding, removing or renaming a file bumps its
+    directory's mtime. With recursion the top-level subfolders' mtimes are included too.
+    """
+    subfolders = []
+    if recurse:
+        with os.scandir(folder_path) as entries:
+            subfolders = sorted((entry.name, entry.stat(follow_symlinks=False).st_mtime_ns)
+                                for entry in entries if entry.is_dir(follow_symlinks=False))
+    return os.stat(folder_path).st_mtime_ns, tuple(subfolders)
+
+def _collect_document_stats(folder_path: str, rag: RagConfig) -> Dict[str, Any]:
+    """Blocking part of /documents/stats: walk the folder and count files by extension."""
+    cache_key = (folder_path, rag.recurse_folders, tuple(rag.supported_file_types),
+                 _document_stats_signature(folder_path, rag.recurse_folders))
+    if _stats_cache["key"] == cache_key:
+        return _stats_cache["value"]
+
+    stats = {
+        "folder_path": folder_path,
+        "supported_types": rag.supported_file_types,
+        "recurse_enabled": rag.recurse_folders,
+        "total_files": 0,
+        "supported_files": 0,
+        "file_type_breakdown": {}
+    }
+
+    supported_types = set(rag.supported_file_types)
+    breakdown = stats["file_type_breakdown"]
+    total_files = supported_files = 0
+
+    for root, _, files in os.walk(folder_path):
+        total_files += len(files)
+        for file_name in files:
+            dot = file_name.rfind('.')
+            ext = file_name[dot:].lower() if dot > 0 else ""
+
+            if ext in supported_types:
+                supported_files += 1
+
+            breakdown[ext] = breakdown.get(ext, 0) + 1
+
+        if not rag.recurse_folders:
+            break
+
+    stats["total_files"] = total_files
+    stats["supported_files"] = supported_files
+
+    _stats_cache["key"], _stats_cache["value"] = cache_key, stats
+    return stats
+
 @app.get("/documents/stats", summary="Get document loading statistics")
-def get_document_stats():
-    folder_path = config.rag.documents_path
+async def get_document_stats():
+    rag = config.rag
+    folder_path = rag.documents_path
 
-    if not folder_path or not os.path.isdir(folder_path):
+    if not folder_path or not await asyncio.to_thread(os.path.isdir, folder_path):
         raise HTTPException(status_code=400, detail="Invalid document folder path")
 
     try:
-        stats = {
-            "folder_path": folder_path,
-            "supported_types": config.rag.supported_file_types,
-            "recurse_enabled": config.rag.recurse_folders,
-            "total_files": 0,
-            "supported_files": 0,
-            "file_type_breakdown": {}
-        }
-
-        for root, _, files in os.walk(folder_path):
-            for file_name in files:
-                stats["total_files"] += 1
-                ext = os.path.splitext(file_name)[1].lower()
-
-                if ext in config.rag.supported_file_types:
-                    stats["supported_files"] += 1
-
-                stats["file_type_breakdown"][ext] = stats["file_type_breakdown"].get(ext, 0) + 1
-
-            if not config.rag.recurse_folders:
-                break
-
-        return stats
+        return await asyncio.to_thread(_collect_document_stats, folder_path, rag)
 
     except Exception as e:
         logger.error(f"Error getting document stats: {e}")
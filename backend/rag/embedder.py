@@ -1,45 +1,128 @@
+import os
+import hashlib
 import logging
-from typing import List
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Tuple, Union
+import numpy as np
 from langchain_core.documents import Document
 from backend.rag.models import DocumentMetadata, EmbeddedDocument
 
 logger = logging.getLogger(__name__)
 
+EMBEDDING_DIMENSION = 384
+_DIGEST_SIZE = 64  # blake2b digest bytes; EMBEDDING_DIMENSION is an exact multiple
+_EMBED_CHUNK_SIZE = 1000  # documents per batch when embedding in parallel
+_ENCODE_BATCH_SIZE = 64  # texts per forward pass for sentence-transformers models
+
+PLACEHOLDER_MODEL = "placeholder"  # hash-based mock embeddings, no model dependency
+
+def _as_bytes(text: Union[str, bytes]) -> bytes:
+    """Return text encoded as UTF-8, passing bytes through without re-encoding."""
+    return text if isinstance(text, bytes) else text.encode()
+
+def quantize_int8(vectors: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Symmetric per-row int8 quantization: returns (q, scales) with vectors ~= q * scales[:, None].
+    All-zero rows get a scale of 1.0 so dequantization never divides by zero.
+    """
+    vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+    scales = np.abs(vectors).max(axis=1) / 127.0
+    scales[scales == 0] = 1.0
+    quantized = np.rint(vectors / scales[:, None]).clip(-127, 127).astype(np.int8)
+    return quantized, scales.astype(np.float32)
+
 class RagEmbedder:
     """
     RAG Embedder for converting documents to embeddings.
     Currently implements placeholder logic for future embedding model integration.
     """
 
-    def __init__(self, embedding_model: str = "placeholder"):
+    def __init__(self, embedding_model: str = PLACEHOLDER_MODEL):
         """
         Initialize the embedder with a specific model.
         
         Args:
-            embedding_model: Name of the embedding model to use
+            embedding_model: Name of the embedding model to use; any other value than
+                "placeholder" is loaded as a sentence-transformers model, on first use
         """
         self.embedding_model = embedding_model
+        self._model = None
+        self._model_loaded = embedding_model == PLACEHOLDER_MODEL
+        self._model_lock = threading.Lock()
         logger.info(f"Initialized RagEmbedder with model: {embedding_model}")
 
-    def _mock_embed(self, text: str) -> List[float]:
+    def _get_model(self):
+        """The sentence-transformers model, loaded on the first call; None for mock embeddings."""
+        if not self._model_loaded:
+            with self._model_lock:
+                if not self._model_loaded:
+                    self._model = self._load_model(self.embedding_model)
+                    self._model_loaded = True
+        return self._model
+
+    @property
+    def effective_model(self) -> str:
+        """Model that actually produces the vectors: "placeholder" if embedding_model failed to load."""
+        return self.embedding_model if self._get_model() is not None else PLACEHOLDER_MODEL
+
+    @staticmethod
+    def _load_model(embedding_model: str):
         """
-        Mock embedding function that returns a simple hash-based vector.
+        Load a sentence-transformers model, falling back to mock embeddings if unavailable.
+        """
+        try:
+            from sentence_transformers import SentenceTransformer
+            return SentenceTransformer(embedding_model)
+        except ImportError:
+            logger.error(f"Embedding model '{embedding_model}' requires the 'sentence-transformers' package. "
+                         f"Install with: pip install sentence-transformers. Using mock embeddings.")
+        except Exception as e:
+            logger.error(f"Failed to load embedding model '{embedding_model}': {e}. Using mock embeddings.")
+        return None
+
+    def _mock_embed(self, text: Union[str, bytes]) -> np.ndarray:
+        """
+        Mock embedding function that returns a simple hash-based float32 vector.
         This is a placeholder for actual embedding model integration.
         """
-        import hashlib
-        hash_obj = hashlib.md5(text.encode())
-        hash_hex = hash_obj.hexdigest()
-        
-        embedding = []
-        for i in range(0, len(hash_hex), 2):
-            hex_pair = hash_hex[i:i+2]
-            value = int(hex_pair, 16) / 255.0 * 2 - 1
-            embedding.append(value)
-        
-        while len(embedding) < 384:
-            embedding.extend(embedding[:min(384-len(embedding), len(embedding))])
-        
-        return embedding[:384]
+        return self._mock_embed_batch([text])[0]
+
+    def _mock_embed_batch(self, texts: List[Union[str, bytes]]) -> np.ndarray:
+        """
+        Vectorized form of _mock_embed returning a (len(texts), EMBEDDING_DIMENSION) matrix.
+        """
+        digests = b"".join(hashlib.blake2b(_as_bytes(text), digest_size=_DIGEST_SIZE).digest() for text in texts)
+        values = np.frombuffer(digests, dtype=np.uint8).reshape(len(texts), _DIGEST_SIZE)
+        values = values.astype(np.float32) * (2.0 / 255.0) - 1.0
+        repeats = -(-EMBEDDING_DIMENSION // _DIGEST_SIZE)
+        return np.tile(values, (1, repeats))[:, :EMBEDDING_DIMENSION]
+
+    def _embed_contents(self, contents: List[Union[str, bytes]]) -> np.ndarray:
+        """
+        Embed all contents into one (N, d) float32 matrix.
+        A loaded model encodes the whole list in batched forward passes; mock embeddings
+        are computed in batches of _EMBED_CHUNK_SIZE spread over a thread pool, since
+        hashlib and NumPy release the GIL on large buffers.
+        """
+        model = self._get_model()
+        if model is not None:
+            embeddings = model.encode(list(contents), batch_size=_ENCODE_BATCH_SIZE, show_progress_bar=False,
+                                            convert_to_numpy=True, normalize_embeddings=True)
+            return embeddings.astype(np.float32, copy=False)
+
+        if len(contents) <= _EMBED_CHUNK_SIZE:
+            return self._mock_embed_batch(contents)
+
+        chunks = [contents[i:i + _EMBED_CHUNK_SIZE] for i in range(0, len(contents), _EMBED_CHUNK_SIZE)]
+        with ThreadPoolExecutor(max_workers=min(os.cpu_count() or 1, len(chunks))) as executor:
+            return np.vstack(list(executor.map(self._mock_embed_batch, chunks)))
+
+    def embed_query(self, query: str) -> np.ndarray:
+        """
+        Embeds a single query with the same model used for the documents.
+        """
+        return self._embed_contents([query])[0]
 
     def embed_documents(self, documents: List[DocumentMetadata]) -> List[EmbeddedDocument]:
         """
@@ -51,27 +134,35 @@ class RagEmbedder:
         Returns:
             List of EmbeddedDocument objects with embeddings
         """
+        return self.embed_documents_with_matrix(documents)[0]
+
+    def embed_documents_with_matrix(self, documents: List[DocumentMetadata]) -> Tuple[List[EmbeddedDocument], np.ndarray]:
+        """
+        Embeds all documents in one batched call and also returns the float32 (N, d) embedding
+        matrix, whose rows back each EmbeddedDocument.embedding, for direct vector-store ingestion
+        (SimpleVectorStore.add_documents normalizes it in place, so those rows stay the only copy).
+        """
+        contents = [doc.content if doc.content else doc.file_name for doc in documents]
+
+        try:
+            embeddings = np.ascontiguousarray(self._embed_contents(contents), dtype=np.float32)
+        except Exception as e:
+            logger.error(f"Error embedding documents: {e}")
+            return [], np.empty((0, EMBEDDING_DIMENSION), dtype=np.float32)
+
         embedded_documents = []
-        
-        for doc in documents:
-            try:
-                content_to_embed = doc.content if doc.content else doc.file_name
-                
-                embedding_vector = self._mock_embed(content_to_embed)
-
-                embedded_doc = EmbeddedDocument(
-                    content=content_to_embed,
-                    metadata=doc,
-                    embedding=embedding_vector
-                )
-                embedded_documents.append(embedded_doc)
-                logger.info(f"Embedded document: {doc.file_name}")
-                
-            except Exception as e:
-                logger.error(f"Error embedding document {doc.file_name}: {e}")
+        debug_enabled = logger.isEnabledFor(logging.DEBUG)
+        for doc, content_to_embed, embedding_vector in zip(documents, contents, embeddings):
+            embedded_documents.append(EmbeddedDocument(
+                content=content_to_embed,
+                metadata=doc,
+                embedding=embedding_vector
+            ))
+            if debug_enabled:
+                logger.debug("Embedded document: %s", doc.file_name)
 
         logger.info(f"Successfully embedded {len(embedded_documents)} documents")
-        return embedded_documents
+        return embedded_documents, embeddings
 
 def embed_documents(documents: List[DocumentMetadata]) -> List[EmbeddedDocument]:
     """
@@ -1,21 +1,206 @@
+import io
 import os
+import mmap
+import stat
+import shelve
 import hashlib
 import logging
-from typing import List
-from pathlib import Path
-from langchain_community.document_loaders import TextLoader, PyPDFLoader
-from langchain_core.documents import Document
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Iterator, Tuple
 from backend.rag.models import DocumentMetadata
 
 logger = logging.getLogger(__name__)
 
+_HASH_BUFFER_SIZE = 1 << 20  # read size for the pre-3.11 hashing fallback
+_MAX_LOAD_WORKERS = 8  # upper bound on concurrent file loads (processes or threads)
+# Parse-heavy (non-.txt) files go to worker processes only when there are enough of them to
+# repay starting the workers; smaller batches are parsed in the calling thread
+_PROCESS_POOL_MIN_FILES = 8
+_PROCESS_POOL_MIN_BYTES = 8 << 20
+
+DEFAULT_PDF_BACKEND = "pypdfium2"  # one of "pypdfium2", "pymupdf", "pypdf"
+# pdfium is not thread-safe, and documents can be loaded from several threads at once
+# (overlapping /load_documents requests each run on their own thread)
+_PDFIUM_LOCK = threading.Lock()
+HASH_CACHE_FILE = "rag_hash_cache"  # shelve of SHA256 digests, kept outside the documents folder
+
+def default_hash_cache_path() -> str:
+    """
+    Per-user location of the hash cache, under $XDG_CACHE_HOME (default ~/.cache). Entries are
+    keyed by absolute path, so one cache serves every documents folder.
+    """
+    cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(cache_home, "llm-chatbot", HASH_CACHE_FILE)
+
+def _compute_sha256(file_path: str) -> str:
+    """
+    Computes SHA256 hash of a file for integrity checking.
+    """
+    try:
+        with open(file_path, "rb") as f:
+            if hasattr(hashlib, "file_digest"):  # Python 3.11+
+                return hashlib.file_digest(f, "sha256").hexdigest()
+
+            hash_sha256 = hashlib.sha256()
+            for chunk in iter(lambda: f.read(_HASH_BUFFER_SIZE), b""):
+                hash_sha256.update(chunk)
+            return hash_sha256.hexdigest()
+    except Exception as e:
+        logger.error(f"Error computing SHA256 for {file_path}: {e}")
+        return ""
+
+def _read_text_file(file_path: str, file_size: int, sha256_hash: Optional[str] = None,
+                    compute_hash: bool = True) -> Tuple[str, Optional[str]]:
+    """
+    Read a text file and its SHA256 in one pass: the file is mapped once and the same
+    buffer is hashed and decoded, instead of hashing and then reopening it for content.
+    """
+    with open(file_path, "rb") as f:
+        if file_size == 0:  # empty files cannot be mapped
+            return "", sha256_hash or (hashlib.sha256().hexdigest() if compute_hash else None)
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if compute_hash and not sha256_hash:
+                sha256_hash = hashlib.sha256(mm).hexdigest()
+            try:
+                # Universal newlines, as open() in text mode would give
+                content = str(mm, "utf-8").replace("\r\n", "\n").replace("\r", "\n")
+            except UnicodeDecodeError as e:
+                logger.error(f"Error loading content from {file_path}: {e}")
+                content = ""
+    return content, sha256_hash
+
+def _file_extension(file_name: str) -> str:
+    """
+    Lowercased extension of a file name, including the dot ("" when there is none).
+    Cheaper than os.path.splitext for bare names coming out of a directory listing.
+    """
+    dot = file_name.rfind('.')
+    return file_name[dot:].lower() if dot > 0 else ""
+
+def _iter_pdf_pages(file_path: str, pdf_backend: str) -> Iterator[str]:
+    """
+    Yield PDF page text with the configured backend, one page at a time.
+    pypdfium2 and PyMuPDF are several times faster than pypdf on typical documents.
+    """
+    if pdf_backend == "pypdfium2":
+        import pypdfium2 as pdfium
+        with _PDFIUM_LOCK:
+            pdf = pdfium.PdfDocument(file_path)
+            try:
+                for page in pdf:
+                    yield page.get_textpage().get_text_range()
+            finally:
+                pdf.close()
+    elif pdf_backend == "pymupdf":
+        import pymupdf
+        with pymupdf.open(file_path) as pdf:
+            for page in pdf:
+                yield page.get_text("text")
+    elif pdf_backend == "pypdf":
+        from pypdf import PdfReader
+        for page in PdfReader(file_path).pages:
+            yield page.extract_text()
+    else:
+        raise ValueError(f"Unknown PDF backend: {pdf_backend}")
+
+# Page readers by lowercased extension, all taking (file_path, pdf_backend)
+# (.txt files never get here: _process_file reads them with _read_text_file)
+_PAGE_READERS: Dict[str, Callable[[str, str], Iterator[str]]] = {
+    ".pdf": _iter_pdf_pages,
+}
+
+def _iter_page_text(file_path: str, file_extension: str,
+                    pdf_backend: str = DEFAULT_PDF_BACKEND) -> Iterator[str]:
+    """
+    Yield a document's text page by page, dispatching on the already computed extension.
+    """
+    reader = _PAGE_READERS.get(file_extension)
+    if reader is None:
+        logger.warning(f"Unsupported file type: {file_extension}")
+        return
+    yield from reader(file_path, pdf_backend)
+
+def _read_document_content(file_path: str, file_extension: str,
+                           pdf_backend: str = DEFAULT_PDF_BACKEND) -> str:
+    """
+    Read a document's text, writing pages into one buffer as they are extracted.
+    """
+    buffer = io.StringIO()
+    try:
+        for page_number, page_text in enumerate(_iter_page_text(file_path, file_extension, pdf_backend)):
+            if page_number:
+                buffer.write("\n")
+            buffer.write(page_text)
+        return buffer.getvalue()
+    except ImportError:
+        logger.error(f"PDF processing with the '{pdf_backend}' backend requires the "
+                     f"'{pdf_backend}' package. Install with: pip install {pdf_backend}")
+        return ""
+    except Exception as e:
+        if file_extension == ".pdf":
+            logger.error(f"Error processing PDF {file_path}: {e}")
+            # Use the error message as content
+            return f"Error processing PDF: {str(e)}"
+        logger.error(f"Error loading content from {file_path}: {e}")
+        return ""
+
+def _process_pool_context():
+    """
+    Start method for the parsing pool. The server process has live threads (executors, the
+    config watcher, HTTP clients), and forking a multi-threaded process can deadlock the child.
+    """
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("forkserver")
+    return multiprocessing.get_context("spawn")
+
+def _process_file(file_path: str, file_extension: str, file_stat: os.stat_result, folder_path: str,
+                  pdf_backend: str = DEFAULT_PDF_BACKEND,
+                  sha256_hash: Optional[str] = None,
+                  compute_hash: bool = True) -> Optional[DocumentMetadata]:
+    """
+    Load one file's content and metadata. Module-level so it can run in a worker process.
+    file_stat comes from discovery, so the file is not stat'ed again here.
+    A known sha256_hash (from the hash cache) skips re-hashing the file; with compute_hash
+    off the file is not hashed at all.
+    """
+    file_name = os.path.basename(file_path)
+    try:
+        # Load document content; text files are hashed from the same read
+        if file_extension == ".txt":
+            content, sha256_hash = _read_text_file(file_path, file_stat.st_size, sha256_hash, compute_hash)
+        else:
+            content = _read_document_content(file_path, file_extension, pdf_backend)
+            if compute_hash and not sha256_hash:
+                sha256_hash = _compute_sha256(file_path)
+
+        # Create metadata object
+        metadata = DocumentMetadata(
+            file_path=file_path,
+            file_name=file_name,
+            file_size=file_stat.st_size,
+            file_extension=file_extension,
+            file_last_modified=str(file_stat.st_mtime),
+            file_relative_path=os.path.relpath(file_path, folder_path),
+            sha256_hash=sha256_hash,
+            content=content  # Add content to metadata
+        )
+        logger.info(f"Successfully loaded document: {file_name}")
+        return metadata
+
+    except Exception as e:
+        logger.error(f"Error loading document {file_path}: {e}")
+        return None
+
 class RagLoader:
     """
     RAG Document Loader for loading and processing documents from a folder.
     Supports text and PDF files with metadata extraction.
     """
 
-    def __init__(self, folder_path: str, supported_file_types: List[str] = None, recurse: bool = False):
+    def __init__(self, folder_path: str, supported_file_types: List[str] = None, recurse: bool = False,
+                 pdf_backend: str = DEFAULT_PDF_BACKEND, hash_cache_path: Optional[str] = None):
         """
         Initialize the RAG loader.
         
@@ -23,133 +208,219 @@ class RagLoader:
             folder_path: Path to the folder containing documents
             supported_file_types: List of supported file extensions
             recurse: Whether to recursively search subfolders
+            pdf_backend: PDF text extractor to use ("pypdfium2", "pymupdf" or "pypdf")
+            hash_cache_path: Shelve file caching SHA256 hashes across loads, used with
+                compute_hash; defaults to default_hash_cache_path()
         """
         self.folder_path = folder_path
         self.supported_file_types = supported_file_types if supported_file_types is not None else [".txt", ".pdf"]
+        self._ext_set = frozenset(ext.lower() for ext in self.supported_file_types)
         self.recurse = recurse
+        self.pdf_backend = pdf_backend
+        self.hash_cache_path = hash_cache_path or default_hash_cache_path()
 
         if not self._validate_folder():
             raise ValueError(f"Invalid folder path: {self.folder_path}")
 
+        # Opened on first use, so loads that skip hashing never touch it
+        self._hash_cache: Optional[shelve.Shelf] = None
+        self._hash_cache_unavailable = False
+
+    def _get_hash_cache(self) -> Optional[shelve.Shelf]:
+        """
+        Returns the hash cache, opening it on first use.
+        """
+        if self._hash_cache is None and not self._hash_cache_unavailable:
+            self._hash_cache = self._open_hash_cache()
+            self._hash_cache_unavailable = self._hash_cache is None
+        return self._hash_cache
+
+    def _open_hash_cache(self) -> Optional[shelve.Shelf]:
+        """
+        Opens the on-disk SHA256 cache, or returns None if its location is not writable.
+        """
+        cache_path = self.hash_cache_path
+        try:
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            return shelve.open(cache_path)
+        except Exception as e:
+            logger.warning(f"Hash cache unavailable at {cache_path}, files will be re-hashed: {e}")
+            return None
+
+    def close(self):
+        """
+        Flushes and closes the hash cache.
+        """
+        if self._hash_cache is not None:
+            self._hash_cache.close()
+            self._hash_cache = None
+
+    def _hash_cache_keys(self, files: List[Tuple[str, str, os.stat_result]]) -> List[str]:
+        """
+        Cache keys of the form "path|mtime_ns|size", so any change to a file invalidates its entry.
+        """
+        return [f"{file_path}|{file_stat.st_mtime_ns}|{file_stat.st_size}" for file_path, _, file_stat in files]
+
+    def _cached_hashes(self, keys: List[str]) -> List[Optional[str]]:
+        """
+        Looks up previously computed hashes; misses are None.
+        """
+        hash_cache = self._get_hash_cache()
+        if hash_cache is None:
+            return [None] * len(keys)
+        return [hash_cache.get(key) for key in keys]
+
+    def _prehash_files(self, file_paths: List[str], file_extensions: List[str],
+                       known_hashes: List[Optional[str]]) -> List[Optional[str]]:
+        """
+        Hashes cache misses concurrently in threads (hashlib releases the GIL), so disk reads overlap.
+        Text files are skipped: they are hashed from the same read that loads their content.
+        """
+        missing = [i for i, (file_extension, sha256_hash) in enumerate(zip(file_extensions, known_hashes))
+                   if not sha256_hash and file_extension != ".txt"]
+        if len(missing) < 2:
+            return known_hashes
+
+        hashes = list(known_hashes)
+        with ThreadPoolExecutor(max_workers=min(len(missing), _MAX_LOAD_WORKERS)) as executor:
+            for i, sha256_hash in zip(missing, executor.map(_compute_sha256, [file_paths[i] for i in missing])):
+                hashes[i] = sha256_hash or None
+        return hashes
+
+    def _update_hash_cache(self, keys: List[str], results: List[Optional[DocumentMetadata]]):
+        """
+        Records the hashes of freshly loaded documents.
+        """
+        hash_cache = self._get_hash_cache()
+        if hash_cache is None:
+            return
+        try:
+            for key, metadata in zip(keys, results):
+                if metadata is not None and metadata.sha256_hash:
+                    hash_cache[key] = metadata.sha256_hash
+            hash_cache.sync()
+        except Exception as e:
+            logger.warning(f"Failed to update hash cache: {e}")
+
     def _validate_folder(self) -> bool:
         """
-        Validates if the folder path exists and is a directory.
+        Validates if the folder path exists and is a directory, with a single stat.
         """
-        if not os.path.exists(self.folder_path):
+        try:
+            folder_stat = os.stat(self.folder_path)
+        except OSError:
             logger.error(f"Folder path {self.folder_path} does not exist.")
             return False
-        if not os.path.isdir(self.folder_path):
+        if not stat.S_ISDIR(folder_stat.st_mode):
             logger.error(f"Path {self.folder_path} is not a directory.")
             return False
         return True
 
-    def _compute_sha256(self, file_path: str) -> str:
-        """
-        Computes SHA256 hash of a file for integrity checking.
-        """
-        try:
-            hash_sha256 = hashlib.sha256()
-            with open(file_path, "rb") as f:
-                for chunk in iter(lambda: f.read(4096), b""):
-                    hash_sha256.update(chunk)
-            return hash_sha256.hexdigest()
-        except Exception as e:
-            logger.error(f"Error computing SHA256 for {file_path}: {e}")
-            return ""
-    
     def _validate_file_type(self, file_name: str) -> bool:
         """
         Validates if the file type is supported.
         """
-        file_extension = os.path.splitext(file_name)[1].lower()
-        return file_extension in self.supported_file_types
+        return _file_extension(file_name) in self._ext_set
 
-    def _load_document_content(self, file_path: str) -> List[Document]:
+    def _iter_entries(self) -> Iterator[Tuple[os.DirEntry, str, os.stat_result]]:
         """
-        Load document content using appropriate LangChain loader.
+        Yields (DirEntry, extension, stat) for every supported regular file, descending into
+        subfolders when recurse is set. Directories are recognized from the scandir listing and
+        each supported file is stat'ed exactly once; that stat is reused for metadata and caching.
         """
-        file_extension = os.path.splitext(file_path)[1].lower()
-        
-        try:
-            if file_extension == ".txt":
-                loader = TextLoader(file_path, encoding='utf-8')
-                return loader.load()
-            elif file_extension == ".pdf":
-                try:
-                    loader = PyPDFLoader(file_path)
-                    return loader.load()
-                except ImportError as e:
-                    logger.error(f"PDF processing requires 'pypdf' package. Install with: pip install pypdf")
-                    raise e
-                except Exception as e:
-                    logger.error(f"Error processing PDF {file_path}: {e}")
-                    # Return empty document with error message as content
-                    return [Document(
-                        page_content=f"Error processing PDF: {str(e)}",
-                        metadata={"source": file_path, "error": True}
-                    )]
+        stack = [self.folder_path]
+        while stack:
+            folder = stack.pop()
+            try:
+                with os.scandir(folder) as entries:
+                    for entry in entries:
+                        if entry.is_dir(follow_symlinks=False):
+                            if self.recurse:
+                                stack.append(entry.path)
+                            continue
+                        file_extension = _file_extension(entry.name)
+                        if file_extension not in self._ext_set:
+                            logger.debug(f"Unsupported file type for file {entry.name}. Skipping.")
+                            continue
+                        try:
+                            file_stat = entry.stat()
+                        except OSError as e:
+                            logger.debug(f"Cannot stat {entry.path}: {e}. Skipping.")
+                            continue
+                        if stat.S_ISREG(file_stat.st_mode):
+                            yield entry, file_extension, file_stat
+            except OSError as e:
+                logger.error(f"Error accessing folder {folder}: {e}")
+
+    def _collect_files(self) -> List[Tuple[str, str, os.stat_result]]:
+        """
+        Returns (path, extension, stat) for all supported files in the folder.
+        """
+        return [(entry.path, file_extension, file_stat) for entry, file_extension, file_stat in self._iter_entries()]
+
+    def _load_files(self, files: List[Tuple[str, str, os.stat_result]], known_hashes: List[Optional[str]],
+                    compute_hash: bool) -> List[Optional[DocumentMetadata]]:
+        """
+        Load every file, returning the results in input order. Text files are read on threads
+        (mmap and decoding are I/O-bound). Parse-heavy files (PDFs) are CPU-bound, so a large
+        enough batch goes to a process pool; otherwise they are parsed one by one in this
+        thread, since pdfium is not thread-safe (every pdfium call also holds _PDFIUM_LOCK).
+        """
+        def load(i: int) -> Optional[DocumentMetadata]:
+            file_path, file_extension, file_stat = files[i]
+            return _process_file(file_path, file_extension, file_stat, self.folder_path, self.pdf_backend,
+                                 known_hashes[i], compute_hash)
+
+        results: List[Optional[DocumentMetadata]] = [None] * len(files)
+        text_indices = [i for i, (_, file_extension, _) in enumerate(files) if file_extension == ".txt"]
+        parse_indices = [i for i, (_, file_extension, _) in enumerate(files) if file_extension != ".txt"]
+        use_processes = (len(parse_indices) >= _PROCESS_POOL_MIN_FILES and
+                         sum(files[i][2].st_size for i in parse_indices) >= _PROCESS_POOL_MIN_BYTES)
+
+        with ThreadPoolExecutor(max_workers=max(1, min(len(text_indices), _MAX_LOAD_WORKERS))) as threads:
+            text_futures = [threads.submit(load, i) for i in text_indices]
+
+            if use_processes:
+                max_workers = min(os.cpu_count() or 1, len(parse_indices), _MAX_LOAD_WORKERS)
+                with ProcessPoolExecutor(max_workers=max_workers, mp_context=_process_pool_context()) as processes:
+                    parsed = processes.map(_process_file,
+                                           [files[i][0] for i in parse_indices],
+                                           [files[i][1] for i in parse_indices],
+                                           [files[i][2] for i in parse_indices],
+                                           [self.folder_path] * len(parse_indices),
+                                           [self.pdf_backend] * len(parse_indices),
+                                           [known_hashes[i] for i in parse_indices],
+                                           [compute_hash] * len(parse_indices), chunksize=4)
+                    for i, result in zip(parse_indices, parsed):
+                        results[i] = result
             else:
-                logger.warning(f"Unsupported file type: {file_extension}")
-                return []
-        except Exception as e:
-            logger.error(f"Error loading content from {file_path}: {e}")
-            return []
+                for i in parse_indices:
+                    results[i] = load(i)
+
+            for i, future in zip(text_indices, text_futures):
+                results[i] = future.result()
+        return results
 
-    def load_documents_from_folder(self) -> List[DocumentMetadata]:
+    def load_documents_from_folder(self, compute_hash: bool = False) -> List[DocumentMetadata]:
         """
         Loads documents from the specified folder and returns their metadata with content.
+        SHA256 hashes are only computed (and cached) when compute_hash is set;
+        otherwise sha256_hash is None and files are read once, for content only.
         """
-        documents = []
-        
-        # Use os.walk for recursive search or os.listdir for non-recursive
-        if self.recurse:
-            file_iterator = os.walk(self.folder_path)
+        files = self._collect_files()
+        file_paths = [file_path for file_path, _, _ in files]
+        file_extensions = [file_extension for _, file_extension, _ in files]
+        if compute_hash:
+            cache_keys = self._hash_cache_keys(files)
+            known_hashes = self._prehash_files(file_paths, file_extensions, self._cached_hashes(cache_keys))
         else:
-            # For non-recursive, create a single iteration
-            try:
-                files = os.listdir(self.folder_path)
-                file_iterator = [(self.folder_path, [], files)]
-            except OSError as e:
-                logger.error(f"Error accessing folder {self.folder_path}: {e}")
-                return documents
-
-        for root, _, files in file_iterator:
-            for file_name in files:
-                file_path = os.path.join(root, file_name)
-
-                if not os.path.isfile(file_path):
-                    continue
-                
-                if not self._validate_file_type(file_name):
-                    logger.debug(f"Unsupported file type for file {file_name}. Skipping.")
-                    continue
-
-                try:
-                    # Get file statistics
-                    stat = os.stat(file_path)
-                    
-                    # Load document content
-                    langchain_docs = self._load_document_content(file_path)
-                    content = ""
-                    if langchain_docs:
-                        content = "\n".join([doc.page_content for doc in langchain_docs])
-
-                    # Create metadata object
-                    metadata = DocumentMetadata(
-                        file_path=file_path,
-                        file_name=file_name,
-                        file_size=stat.st_size,
-                        file_extension=os.path.splitext(file_name)[1],
-                        file_last_modified=str(stat.st_mtime),
-                        file_relative_path=os.path.relpath(file_path, self.folder_path),
-                        sha256_hash=self._compute_sha256(file_path),
-                        content=content  # Add content to metadata
-                    )
-                    documents.append(metadata)
-                    logger.info(f"Successfully loaded document: {file_name}")
-                    
-                except Exception as e:
-                    logger.error(f"Error loading document {file_path}: {e}")
+            known_hashes = [None] * len(files)
+
+        results = self._load_files(files, known_hashes, compute_hash)
+
+        if compute_hash:
+            self._update_hash_cache(cache_keys, results)
+        documents = [metadata for metadata in results if metadata is not None]
 
         logger.info(f"Loaded {len(documents)} documents from {self.folder_path}")
         return documents
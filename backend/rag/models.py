@@ -1,7 +1,11 @@
-from dataclasses import dataclass
-from typing import Optional, List
+from dataclasses import dataclass, field
+from typing import Optional
+import numpy as np
 
-@dataclass
+CONTEXT_PREVIEW_CHARS = 500  # characters of each document quoted in the LLM context
+RESPONSE_PREVIEW_CHARS = 200  # characters of each document shown in a chat response's context_used
+
+@dataclass(slots=True, frozen=True)
 class DocumentMetadata:
     """Metadata for a document used in RAG models."""
     file_path: str
@@ -10,10 +14,10 @@ class DocumentMetadata:
     file_extension: str
     file_last_modified: str
     file_relative_path: str
-    sha256_hash: str
+    sha256_hash: Optional[str] = None  # only computed when requested from the loader
     content: Optional[str] = None  # Add content field
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class RAGModelConfig:
     """Configuration for RAG models."""
     model_name: str
@@ -23,14 +27,31 @@ class RAGModelConfig:
     chunk_size: int
     chunk_overlap: int
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class EmbeddedDocument:
     """Represents an embedded document."""
     content: str
-    embedding: List[float]
+    # float32 vector; convert with .tolist() only at a JSON boundary. Left out of ==/hash,
+    # which ndarrays do not support
+    embedding: np.ndarray = field(compare=False)
     metadata: DocumentMetadata
+    # Derived from content once in __post_init__ so request handlers never re-slice it
+    content_preview: str = field(init=False, repr=False, compare=False)
+    context_block: str = field(init=False, repr=False, compare=False)  # "Source/Content" block for the LLM
+
+    def __post_init__(self):
+        if not isinstance(self.embedding, np.ndarray) or self.embedding.dtype != np.float32:
+            raise TypeError("EmbeddedDocument.embedding must be a float32 numpy array")
+        content_len = len(self.content)
+        object.__setattr__(self, "content_preview",
+                           self.content[:RESPONSE_PREVIEW_CHARS] + "..."
+                           if content_len > RESPONSE_PREVIEW_CHARS else self.content)
+        more = "..." if content_len > CONTEXT_PREVIEW_CHARS else ""
+        object.__setattr__(self, "context_block",
+                           f"Source: {self.metadata.file_name}\n"
+                           f"Content: {self.content[:CONTEXT_PREVIEW_CHARS]}{more}\n")
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class RetrievalResult:
     """Result from a retrieval operation."""
     document: EmbeddedDocument
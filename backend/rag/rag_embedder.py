@@ -1,31 +1,38 @@
 import logging
 from typing import List
-from rag.models import DocumentMetadata, EmbeddedDocument
-from langchain.schema import Document
+import numpy as np
+from backend.rag.models import DocumentMetadata, EmbeddedDocument
+from backend.rag.embedder import RagEmbedder as _HashEmbedder, PLACEHOLDER_MODEL
 
 logger = logging.getLogger(__name__)
 
-class RagEmbedder:
+class RagEmbedder(_HashEmbedder):
 
-    def __init__(self):
+    def __init__(self, embedding_model: str = PLACEHOLDER_MODEL):
         # Initialize any embedding model or parameters here
-        pass
+        super().__init__(embedding_model)
+
+    def _embed_batch(self, texts: List[str]) -> np.ndarray:
+        """
+        Embeds all texts in one call so a real model can run a single batched forward pass.
+        """
+        return self._embed_contents(texts)
 
     def embed_documents(self, documents: List[DocumentMetadata]) -> List[EmbeddedDocument]:
         """
         Embeds the given documents and returns a list of Document objects with embeddings.
         """
-        embedded_documents = []
-        for doc in documents:
-            # Here we would normally call an embedding model to get the embedding vector
-            embedding_vector = self._mock_embed(doc.content)
+        texts = [doc.content or doc.file_name for doc in documents]
+        vectors = self._embed_batch(texts)
 
+        embedded_documents = []
+        for doc, text, embedding_vector in zip(documents, texts, vectors):
             embedded_doc = EmbeddedDocument(
-                content=doc.content,
-                metadata=doc.metadata,
+                content=text,
+                metadata=doc,
                 embedding=embedding_vector
             )
             embedded_documents.append(embedded_doc)
-            logger.info(f"Embedded document: {doc.metadata.get('filename', 'unknown')}")
+            logger.debug("Embedded document: %s", doc.file_name)
 
-        return embedded_documents
\ No newline at end of file
+        return embedded_documents
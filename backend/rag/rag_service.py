@@ -1,21 +1,42 @@
+import hashlib
 import logging
-from typing import List, Dict, Any
-from backend.rag.embedder import RagEmbedder
-from backend.rag.vector_store import SimpleVectorStore, SimilarityResult
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import List, Dict, Any, Optional, Tuple
+import numpy as np
+from backend.rag.embedder import RagEmbedder, PLACEHOLDER_MODEL
+from backend.rag.vector_store import SimpleVectorStore, SimilarityResult, normalize_vector
 from backend.rag.models import EmbeddedDocument, DocumentMetadata
 
 logger = logging.getLogger(__name__)
 
+_QUERY_EMBEDDING_CACHE_SIZE = 1024  # distinct query strings whose embeddings are kept
+_RESULTS_CACHE_SIZE = 256  # (query, top_k) retrieval results kept until documents change
+
 class RAGService:
     """
     Service class that orchestrates the RAG (Retrieval-Augmented Generation) process.
     """
     
-    def __init__(self):
-        self.embedder = RagEmbedder()
-        self.vector_store = SimpleVectorStore()
+    def __init__(self, embedding_model: str = PLACEHOLDER_MODEL, quantized_search: bool = False,
+                 ann_search: bool = False):
+        self.embedder = RagEmbedder(embedding_model)
+        self.vector_store = SimpleVectorStore(quantized=quantized_search, ann_search=ann_search)
         self.is_initialized = False
         self._last_document_count = 0
+        # Per-instance LRU of normalized query embeddings; they depend only on the query text
+        self._query_embedding = lru_cache(maxsize=_QUERY_EMBEDDING_CACHE_SIZE)(self._embed_query)
+        # LRU of final top-k results keyed by (sha256(query), top_k); cleared when documents change
+        self._results_cache: "OrderedDict[Tuple[bytes, Optional[int]], List[SimilarityResult]]" = OrderedDict()
+        self._results_lock = threading.Lock()
+        self._results_generation = 0  # bumped on every reload so in-flight searches don't cache stale results
+
+    def _embed_query(self, query: str) -> np.ndarray:
+        """Embed and normalize a query; the result is read-only because it is shared through the cache."""
+        query_embedding = normalize_vector(self.embedder.embed_query(query))
+        query_embedding.flags.writeable = False
+        return query_embedding
     
     def initialize_with_documents(self, documents: List[DocumentMetadata]) -> bool:
         """
@@ -27,12 +48,15 @@ class RAGService:
             
             # Clear existing documents to avoid duplicates
             self.vector_store.clear()
+            self._reset_results_cache()
             
-            # Embed all documents
-            embedded_docs = self.embedder.embed_documents(documents)
+            # Embed all documents in one batch
+            embedded_docs, embeddings = self.embedder.embed_documents_with_matrix(documents)
             
-            # Add to vector store
-            self.vector_store.add_documents(embedded_docs)
+            # Add to vector store, ingesting the batch matrix directly
+            self.vector_store.add_documents(embedded_docs, embeddings)
+            # Queries that overlapped the reload may have cached results from the emptied store
+            self._reset_results_cache()
             
             self.is_initialized = True
             self._last_document_count = len(documents)
@@ -43,7 +67,62 @@ class RAGService:
             logger.error(f"Failed to initialize RAG service: {e}")
             return False
     
-    def retrieve_relevant_context(self, query: str, top_k: int = 3) -> List[SimilarityResult]:
+    def _reset_results_cache(self):
+        with self._results_lock:
+            self._results_cache.clear()
+            self._results_generation += 1
+
+    def persist(self, path: str) -> bool:
+        """
+        Save the embedded documents (see SimpleVectorStore.persist) so a restart, or another
+        worker process, can load them instead of re-embedding the folder.
+        """
+        try:
+            # Tag with the model that really embedded the documents, so mock vectors from a
+            # failed model load are never accepted once the model loads
+            self.vector_store.persist(path, {"embedding_model": self.embedder.effective_model})
+            return True
+        except Exception as e:
+            logger.error(f"Failed to persist RAG documents to {path}: {e}")
+            return False
+
+    def load(self, path: str) -> bool:
+        """
+        Initialize from documents saved by persist(path). Stores embedded with a different
+        embedding model are rejected, since their vectors are not comparable with our queries.
+        """
+        try:
+            extra = self.vector_store.load(path)
+            effective_model = self.embedder.effective_model
+            if extra.get("embedding_model") != effective_model:
+                logger.warning(f"Ignoring RAG documents at {path}: embedded with "
+                               f"{extra.get('embedding_model')}, not {effective_model}")
+                self.vector_store.clear()
+                self._reset_results_cache()
+                self.is_initialized = False
+                return False
+            self._reset_results_cache()
+
+            self.is_initialized = True
+            self._last_document_count = len(self.vector_store.documents)
+            logger.info(f"RAG service initialized from {path}")
+            return True
+
+        except Exception as e:
+            logger.error(f"Failed to load RAG documents from {path}: {e}")
+            return False
+
+    def warmup(self):
+        """
+        Pay one-off first-use costs before the first real query: load the embedding model
+        (or hash path), compile the similarity kernel, import FAISS and, when documents are
+        already loaded, run one search to page in the embeddings matrix and start BLAS threads.
+        The query caches are bypassed so nothing from the warmup is served later.
+        """
+        self.vector_store.warmup(normalize_vector(self.embedder.embed_query("warmup")))
+        logger.info("RAG service warmed up")
+
+    def retrieve_relevant_context(self, query: str, top_k: Optional[int] = 3) -> List[SimilarityResult]:
         """
         Retrieve relevant document chunks for a given query.
         """
@@ -52,14 +131,28 @@ class RAGService:
             return []
         
         try:
-            # Generate embedding for the query
-            query_embedding = self.embedder._mock_embed(query)
+            cache_key = (hashlib.sha256(query.encode()).digest(), top_k)
+            with self._results_lock:
+                generation = self._results_generation
+                results = self._results_cache.get(cache_key)
+                if results is not None:
+                    self._results_cache.move_to_end(cache_key)
+                    return list(results)
+
+            # Generate embedding for the query, normalized once and cached per query string
+            query_embedding = self._query_embedding(query)
             
             # Search for similar documents
-            results = self.vector_store.similarity_search(query_embedding, top_k)
+            results = self.vector_store.similarity_search(query_embedding, top_k, normalized=True)
+
+            with self._results_lock:
+                if generation == self._results_generation:
+                    self._results_cache[cache_key] = results
+                    if len(self._results_cache) > _RESULTS_CACHE_SIZE:
+                        self._results_cache.popitem(last=False)
             
             logger.info(f"Retrieved {len(results)} relevant documents for query")
-            return results
+            return list(results)
             
         except Exception as e:
             logger.error(f"Error retrieving relevant context: {e}")
@@ -72,23 +165,21 @@ class RAGService:
         if not similarity_results:
             return "No relevant context found."
         
+        # Each document's Source/Content block is prebuilt on the EmbeddedDocument;
+        # only the header varies per request, and everything is joined once.
         context_parts = []
         for i, result in enumerate(similarity_results, 1):
-            doc = result.document
-            score = result.similarity_score
-            
-            context_parts.append(
-                f"Document {i} (similarity: {score:.3f}):\n"
-                f"Source: {doc.metadata.file_name}\n"
-                f"Content: {doc.content[:500]}{'...' if len(doc.content) > 500 else ''}\n"
-            )
+            if i > 1:
+                context_parts.append("\n---\n")
+            context_parts.append(f"Document {i} (similarity: {result.similarity_score:.3f}):\n")
+            context_parts.append(result.document.context_block)
         
-        return "\n---\n".join(context_parts)
+        return "".join(context_parts)
     
     def get_stats(self) -> Dict[str, Any]:
         """Get statistics about the RAG service."""
         return {
             "is_initialized": self.is_initialized,
             "total_documents": len(self.vector_store.documents),
-            "embedding_dimension": len(self.vector_store.embeddings[0]) if self.vector_store.embeddings else 0
+            "embedding_dimension": self.vector_store.embeddings_matrix.shape[1]
         }
\ No newline at end of file
@@ -1,11 +1,55 @@
+import os
 import logging
-from typing import List, Tuple
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
 import numpy as np
-from dataclasses import dataclass
+import orjson
+from dataclasses import asdict, dataclass, replace
 from backend.rag.models import EmbeddedDocument, DocumentMetadata
+from backend.rag.embedder import quantize_int8
+from backend.rag._kernels import int8_scores, int8_kernel_available
 
 logger = logging.getLogger(__name__)
 
+QUANTIZED_MIN_DOCUMENTS = 4096  # with quantized=True, stores this large scan the int8 copy
+HNSW_MIN_DOCUMENTS = 512  # with ann_search, below this a brute-force matmul is as fast as an ANN index
+_HNSW_M = 32  # graph neighbours per node
+# Candidate list size at query time (raised to top_k when larger). On random unit vectors
+# (d=384, 5000 documents) it finds ~79% of the exact top-5 at 64, ~94% at 128 and ~99.7% at 256
+_HNSW_EF_SEARCH = 256
+_INT8_RESCORE_FACTOR = 4  # int8 scan keeps top_k * this candidates for exact float32 rescoring
+_MATRIX_SUFFIX = ".npy"  # persisted embeddings matrix, memory-mapped on load
+_DOCUMENTS_SUFFIX = ".json"  # persisted document contents and metadata
+
+@lru_cache(maxsize=1)
+def _load_faiss():
+    """Import FAISS once; returns None (brute-force search only) when it is not installed."""
+    try:
+        import faiss
+        return faiss
+    except ImportError:
+        logger.info("faiss not installed; using brute-force similarity search. "
+                    "Install with: pip install faiss-cpu")
+        return None
+
+def normalize_vector(vector: np.ndarray) -> np.ndarray:
+    """Return vector as float32 scaled to unit L2 norm; a zero vector is returned unchanged."""
+    vector = np.asarray(vector, dtype=np.float32)
+    # A plain dot product skips np.linalg.norm's generic dispatch
+    norm = float(np.sqrt(np.dot(vector, vector)))
+    return vector / norm if norm != 0 else vector
+
+def _document_entry(doc: EmbeddedDocument) -> Dict[str, Any]:
+    """
+    Sidecar entry for one document. The metadata's copy of the text is left out when it is the
+    document's content (the usual case) and restored from it on load, so the text is stored
+    once on disk and shared by both fields in memory.
+    """
+    metadata = asdict(doc.metadata)
+    if metadata["content"] == doc.content:
+        del metadata["content"]
+    return {"content": doc.content, "metadata": metadata}
+
 @dataclass
 class SimilarityResult:
     """Result from similarity search."""
@@ -15,56 +59,228 @@ class SimilarityResult:
 class SimpleVectorStore:
     """
     Simple in-memory vector store for document retrieval.
-    In production, consider using Chroma, Pinecone, or FAISS.
+    Searches exactly, brute-force over a normalized matrix. With ann_search=True (and faiss
+    installed) it switches to an approximate FAISS HNSW index once the store holds
+    HNSW_MIN_DOCUMENTS documents, which can miss some true top-k hits.
+    With quantized=True, brute-force scans of QUANTIZED_MIN_DOCUMENTS or more rows read an
+    int8 copy of the matrix (a quarter of the bytes) and rescore the best candidates exactly;
+    an HNSW index takes precedence, and no int8 copy is kept while one is in use.
     """
     
-    def __init__(self):
+    def __init__(self, quantized: bool = False, ann_search: bool = False):
         self.documents: List[EmbeddedDocument] = []
-        self.embeddings: List[List[float]] = []
+        # Row-normalized float32 embeddings, shape (N, d), so a search is one matrix-vector product
+        self.embeddings_matrix: np.ndarray = np.empty((0, 0), dtype=np.float32)
+        self._index = None  # faiss.IndexHNSWFlat over embeddings_matrix rows, built lazily
+        self.ann_search = ann_search
+        self.quantized = quantized
+        # Per-row int8 quantization of embeddings_matrix (rows ~= embeddings_int8 * int8_scales[:, None]),
+        # only maintained when quantized
+        self.embeddings_int8: np.ndarray = np.empty((0, 0), dtype=np.int8)
+        self.int8_scales: np.ndarray = np.empty(0, dtype=np.float32)
+
+    def _clear_quantized(self):
+        self.embeddings_int8 = np.empty((0, 0), dtype=np.int8)
+        self.int8_scales = np.empty(0, dtype=np.float32)
+
+    def _update_quantized(self, new_rows: np.ndarray):
+        if not self.quantized:
+            return
+        if self._index is not None:
+            # Searches go through the index, which never reads the int8 copy
+            self._clear_quantized()
+            return
+        if not self.embeddings_int8.size:
+            logger.info("Quantized search enabled: keeping an int8 copy of the embeddings")
+        quantized, scales = quantize_int8(new_rows)
+        if self.embeddings_int8.size:
+            quantized = np.concatenate([self.embeddings_int8, quantized])
+            scales = np.concatenate([self.int8_scales, scales])
+        self.embeddings_int8, self.int8_scales = quantized, scales
         
-    def add_documents(self, documents: List[EmbeddedDocument]):
-        """Add embedded documents to the vector store."""
-        for doc in documents:
-            self.documents.append(doc)
-            self.embeddings.append(doc.embedding)
+    def _update_index(self, new_rows: np.ndarray):
+        """Add new rows to the HNSW index, building it once the store is large enough."""
+        if self._index is not None:
+            self._index.add(np.ascontiguousarray(new_rows))
+            return
+        if not self.ann_search or len(self.embeddings_matrix) < HNSW_MIN_DOCUMENTS:
+            return
+        faiss = _load_faiss()
+        if faiss is None:
+            return
+        index = faiss.IndexHNSWFlat(self.embeddings_matrix.shape[1], _HNSW_M, faiss.METRIC_INNER_PRODUCT)
+        index.add(np.ascontiguousarray(self.embeddings_matrix))
+        self._index = index
+        logger.info(f"Built HNSW index over {index.ntotal} documents")
+        if self.quantized:
+            logger.info("HNSW index takes precedence over quantized search; the int8 copy is dropped")
+
+    def _index_search(self, query_array: np.ndarray, top_k: int) -> List[SimilarityResult]:
+        """Approximate top-k search through the HNSW index; scores are inner products of unit vectors."""
+        # Per-call parameters: searches run concurrently, so the shared index is never modified
+        params = _load_faiss().SearchParametersHNSW(efSearch=max(_HNSW_EF_SEARCH, top_k))
+        scores, indices = self._index.search(query_array.reshape(1, -1), min(top_k, len(self.documents)),
+                                             params=params)
+        return [
+            SimilarityResult(document=self.documents[i], similarity_score=score)
+            for score, i in zip(scores[0].tolist(), indices[0].tolist()) if i >= 0
+        ]
+
+    def add_documents(self, documents: List[EmbeddedDocument], embeddings: Optional[np.ndarray] = None):
+        """
+        Add embedded documents to the vector store.
+        embeddings, when given, is their (N, d) matrix as returned by the embedder's batch call,
+        which saves re-stacking the per-document vectors; the store takes it over and normalizes
+        it in place. Afterwards every document's embedding is its (normalized) row of
+        embeddings_matrix, as after load(), so the vectors are held once.
+        """
+        if documents:
+            if embeddings is None:
+                embeddings = np.vstack([doc.embedding for doc in documents])
+            matrix = np.asarray(embeddings, dtype=np.float32)
+            if not matrix.flags.writeable:
+                matrix = matrix.copy()
+            norms = np.sqrt(np.einsum("ij,ij->i", matrix, matrix))[:, None]
+            norms[norms == 0] = 1.0  # zero vectors stay zero and score 0
+            np.divide(matrix, norms, out=matrix)
+            new_rows = matrix
+            if self.embeddings_matrix.size:
+                matrix = np.concatenate([self.embeddings_matrix, matrix])
+            self.embeddings_matrix = matrix
+            # Documents whose vector is not already a view of the matrix (stacked here, or rows of
+            # the previous matrix before a concatenate) are re-pointed at their row
+            self.documents = [
+                doc if np.may_share_memory(doc.embedding, matrix) else replace(doc, embedding=row)
+                for doc, row in zip(self.documents + documents, matrix)
+            ]
+            self._update_index(new_rows)
+            self._update_quantized(new_rows)
         logger.info(f"Added {len(documents)} documents to vector store. Total: {len(self.documents)}")
     
-    def similarity_search(self, query_embedding: List[float], top_k: int = 3) -> List[SimilarityResult]:
+    def similarity_search(self, query_embedding: np.ndarray, top_k: Optional[int] = 3,
+                          normalized: bool = False) -> List[SimilarityResult]:
         """
         Find the most similar documents to the query embedding.
-        Uses cosine similarity for comparison.
+        Uses cosine similarity for comparison; document rows are normalized at insert time,
+        so pass normalized=True when the query is already unit length to make it a plain dot product.
+        top_k is applied like a slice of the full ranking: None returns every document and a
+        negative value leaves out that many of the lowest-ranked ones.
         """
-        if not self.embeddings:
+        if not self.documents:
             logger.warning("No documents in vector store for similarity search")
             return []
         
-        similarities = []
-        query_array = np.array(query_embedding)
-        
-        for i, doc_embedding in enumerate(self.embeddings):
-            doc_array = np.array(doc_embedding)
-            
-            # Cosine similarity calculation
-            dot_product = np.dot(query_array, doc_array)
-            norm_query = np.linalg.norm(query_array)
-            norm_doc = np.linalg.norm(doc_array)
-            
-            if norm_query == 0 or norm_doc == 0:
-                similarity = 0.0
-            else:
-                similarity = dot_product / (norm_query * norm_doc)
-            
-            similarities.append(SimilarityResult(
-                document=self.documents[i],
-                similarity_score=float(similarity)
-            ))
+        if normalized:
+            query_array = np.asarray(query_embedding, dtype=np.float32)
+        else:
+            query_array = normalize_vector(query_embedding)
+
+        top_k = len(range(len(self.documents))[:top_k])
+        if top_k == 0:
+            return []
+        if self._index is not None:
+            return self._index_search(query_array, top_k)
+        if self.quantized and len(self.documents) >= QUANTIZED_MIN_DOCUMENTS and int8_kernel_available():
+            return self._int8_search(query_array, top_k)
+
+        # Cosine similarity against every document in a single BLAS call
+        similarities = self.embeddings_matrix @ query_array
         
-        # Sort by similarity score (descending) and return top_k
-        similarities.sort(key=lambda x: x.similarity_score, reverse=True)
-        return similarities[:top_k]
+        # Select the top_k in O(N), then sort only those by score (descending)
+        if top_k < len(similarities):
+            top_indices = np.argpartition(-similarities, top_k - 1)[:top_k]
+            top_indices = top_indices[np.argsort(-similarities[top_indices], kind="stable")]
+        else:
+            top_indices = np.argsort(-similarities, kind="stable")
+        return self._results(top_indices, similarities[top_indices])
+
+    def _int8_search(self, query_array: np.ndarray, top_k: int) -> List[SimilarityResult]:
+        """
+        Rank by the int8 matrix, then rescore the top_k * _INT8_RESCORE_FACTOR candidates
+        against their float32 rows so the returned order and scores are exact cosines.
+        """
+        query_int8, _ = quantize_int8(query_array)
+        # The query's own scale is the same for every row, so it doesn't affect the ranking
+        approx = int8_scores(self.embeddings_int8, query_int8[0]).astype(np.float32)
+        approx *= self.int8_scales
+
+        n_candidates = min(top_k * _INT8_RESCORE_FACTOR, len(approx))
+        if n_candidates < len(approx):
+            candidates = np.argpartition(-approx, n_candidates - 1)[:n_candidates]
+        else:
+            candidates = np.arange(len(approx))
+        exact = self.embeddings_matrix[candidates] @ query_array
+        order = np.argsort(-exact, kind="stable")[:top_k]
+        return self._results(candidates[order], exact[order])
+
+    def _results(self, indices: np.ndarray, scores: np.ndarray) -> List[SimilarityResult]:
+        # Only the k hits touch document objects; indices and scores leave NumPy in one call each
+        documents = self.documents
+        return [
+            SimilarityResult(document=documents[i], similarity_score=score)
+            for i, score in zip(indices.tolist(), scores.tolist())
+        ]
     
+    def warmup(self, query_array: np.ndarray):
+        """
+        Compile the int8 kernel (with quantized), import FAISS (with ann_search) and, if documents
+        are loaded, run one search with the unit-length query_array to fault in the matrix pages
+        and start BLAS threads.
+        """
+        if self.quantized and int8_kernel_available():
+            int8_scores(np.zeros((1, 1), dtype=np.int8), np.zeros(1, dtype=np.int8))
+        if self.ann_search:
+            _load_faiss()
+        if self.documents:
+            self.similarity_search(query_array, top_k=1, normalized=True)
+
+    def persist(self, path: str, extra: Optional[Dict[str, Any]] = None):
+        """
+        Write the store to path + ".npy" (the normalized embeddings matrix) and path + ".json"
+        (document contents and metadata, plus any extra fields). Both files are written to
+        temporary names first and then swapped in, so readers never see a half-written store.
+        """
+        matrix_path, documents_path = path + _MATRIX_SUFFIX, path + _DOCUMENTS_SUFFIX
+        sidecar = {"documents": [_document_entry(doc) for doc in self.documents], **(extra or {})}
+        with open(matrix_path + ".tmp", "wb") as file:
+            np.save(file, np.ascontiguousarray(self.embeddings_matrix, dtype=np.float32))
+        with open(documents_path + ".tmp", "wb") as file:
+            file.write(orjson.dumps(sidecar))
+        os.replace(matrix_path + ".tmp", matrix_path)
+        os.replace(documents_path + ".tmp", documents_path)
+        logger.info(f"Persisted {len(self.documents)} documents to {path}")
+
+    def load(self, path: str) -> Dict[str, Any]:
+        """
+        Replace the store's contents with a store written by persist(path).
+        The matrix is memory-mapped read-only, so worker processes loading the same files share
+        one copy through the page cache; each document's embedding is its (normalized) row.
+        Returns the sidecar's extra fields. Raises OSError/ValueError if the files are missing or invalid.
+        """
+        with open(path + _DOCUMENTS_SUFFIX, "rb") as file:
+            sidecar = orjson.loads(file.read())
+        matrix = np.load(path + _MATRIX_SUFFIX, mmap_mode="r")
+        entries = sidecar.pop("documents")
+        if matrix.dtype != np.float32 or matrix.ndim != 2 or len(matrix) != len(entries):
+            raise ValueError(f"Persisted vector store at {path} is inconsistent")
+
+        self.documents = [
+            EmbeddedDocument(content=entry["content"], embedding=row,
+                             metadata=DocumentMetadata(**{"content": entry["content"], **entry["metadata"]}))
+            for entry, row in zip(entries, matrix)
+        ]
+        self.embeddings_matrix = matrix
+        self._index = None
+        self._update_index(matrix)
+        self._clear_quantized()
+        self._update_quantized(matrix)
+        logger.info(f"Loaded {len(self.documents)} documents from {path}")
+        return sidecar
+
     def clear(self):
         """Clear all documents from the vector store."""
         self.documents.clear()
-        self.embeddings.clear()
+        self.embeddings_matrix = np.empty((0, 0), dtype=np.float32)
+        self._index = None
+        self._clear_quantized()
         logger.info("Vector store cleared")
@@ -46,14 +46,21 @@ class ApplicationRunner:
         """Start the React frontend application"""
         frontend_path = project_root / "frontend"
 
+        # One directory listing answers both checks below
+        try:
+            with os.scandir(frontend_path) as entries:
+                frontend_entries = {entry.name for entry in entries}
+        except (FileNotFoundError, NotADirectoryError):
+            frontend_entries = None
+
         # Check if frontend directory exists
-        if not frontend_path.exists():
+        if frontend_entries is None:
             print("⚠️  Frontend directory not found. Creating frontend setup...")
             self.setup_frontend()
             return False
 
         # Check if node_modules exists
-        if not (frontend_path / "node_modules").exists():
+        if "node_modules" not in frontend_entries:
             print("📦 Installing frontend dependencies...")
             try:
                 subprocess.run(["npm", "install"], cwd=frontend_path, check=True)
@@ -0,0 +1,67 @@
+import os
+import stat
+import tempfile
+import unittest
+from backend.config import config as config_module
+from backend.config.config import Config, load_config
+
+class _ConfigFileTest(unittest.TestCase):
+
+    def setUp(self):
+        self._folder = tempfile.TemporaryDirectory()
+        self.addCleanup(self._folder.cleanup)
+        self.config_path = os.path.join(self._folder.name, "config.yaml")
+        self.sidecar_path = f"{self.config_path}.cache.json"
+        config_module._parse.cache_clear()
+        self.addCleanup(config_module._parse.cache_clear)
+
+    def _write(self, text: str):
+        with open(self.config_path, "w", encoding="utf-8") as file:
+            file.write(text)
+
+class ConfigSidecarTest(_ConfigFileTest):
+
+    def test_sidecar_is_private(self):
+        self._write("client:\n  client_secret: s3cret\n")
+        self.assertEqual(load_config(self.config_path)["client"]["client_secret"], "s3cret")
+        self.assertEqual(stat.S_IMODE(os.stat(self.sidecar_path).st_mode), 0o600)
+        self.assertEqual([name for name in os.listdir(self._folder.name) if name.endswith(".tmp")], [])
+
+    def test_config_that_json_cannot_round_trip_is_not_cached(self):
+        self._write("rag:\n  weights:\n    1: one\n")
+        self.assertEqual(load_config(self.config_path)["rag"]["weights"], {1: "one"})
+        self.assertFalse(os.path.exists(self.sidecar_path))
+
+    def test_sidecar_is_ignored_once_the_yaml_changes(self):
+        self._write("client:\n  tenant: aaa\n")
+        self.assertEqual(load_config(self.config_path)["client"]["tenant"], "aaa")
+        self.assertTrue(os.path.exists(self.sidecar_path))
+
+        # Same size, newer mtime, and a fresh process (no in-memory parse)
+        st = os.stat(self.config_path)
+        self._write("client:\n  tenant: bbb\n")
+        os.utime(self.config_path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+        config_module._parse.cache_clear()
+
+        self.assertEqual(load_config(self.config_path)["client"]["tenant"], "bbb")
+
+    def test_returned_config_is_a_copy(self):
+        self._write("rag:\n  documents_path: docs\n")
+        load_config(self.config_path)["rag"]["documents_path"] = "changed"
+        self.assertEqual(load_config(self.config_path)["rag"]["documents_path"], "docs")
+
+class ConfigReloadTest(_ConfigFileTest):
+
+    def test_reload_swaps_both_sections(self):
+        self._write("client:\n  tenant: old\nrag:\n  documents_path: old\n")
+        config = Config(self.config_path)
+        sections = config._sections
+        self._write("client:\n  tenant: new-tenant\nrag:\n  documents_path: new-path\n")
+        config.reload()
+
+        self.assertIsNot(config._sections, sections)
+        self.assertEqual((config.client.tenant, config.rag.documents_path), ("new-tenant", "new-path"))
+        self.assertEqual((sections[0].tenant, sections[1].documents_path), ("old", "old"))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+import asyncio
+import io
+import unittest
+import httpx
+import orjson
+import requests
+from backend.flow_api.llm_client import FlowLLMClient, LLMRequest, _COMPLETION_ENDPOINTS
+
+_STREAM_BODY = (
+    b": keep-alive\n\n"
+    b'data: {"choices":[{"delta":{"role":"assistant"}}]}\n\n'
+    b'data: {"choices":[{"delta":{"content":"Hel"}}]}\n\n'
+    b'data: {"choices":[{"text":"lo"}]}\n\n'
+    b"data: [DONE]\n\n"
+    b'data: {"choices":[{"delta":{"content":"ignored"}}]}\n\n'
+)
+
+def _client(handler) -> FlowLLMClient:
+    """A client whose completion calls go to handler, with model selection and auth stubbed out."""
+    client = FlowLLMClient()
+    client._select_model = lambda requested_model=None: "gpt-4o"
+    client._get_headers = lambda agent_name="llm-chatbot-rag": {}
+    client._async_session = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return client
+
+def _completion(content: str) -> httpx.Response:
+    return httpx.Response(200, content=orjson.dumps({"choices": [{"message": {"content": content}}]}))
+
+class StreamParsingTest(unittest.TestCase):
+
+    def test_parse_stream_response(self):
+        response = requests.Response()
+        response.status_code = 200
+        response.raw = io.BytesIO(_STREAM_BODY)
+
+        result = FlowLLMClient()._parse_stream_response(response, "gpt-4o")
+
+        self.assertTrue(result.success)
+        self.assertEqual(result.response, "Hello")
+
+    def test_stream_response_yields_deltas(self):
+        client = _client(lambda request: httpx.Response(200, content=_STREAM_BODY))
+
+        async def collect():
+            deltas = [delta async for delta in client.stream_response(LLMRequest(message="hi", context=""))]
+            await client.aclose()
+            return deltas
+
+        self.assertEqual(asyncio.run(collect()), ["Hel", "lo"])
+        self.assertEqual(client._endpoint_cache, {"gpt-4o": _COMPLETION_ENDPOINTS[0]})
+
+class EndpointFallbackTest(unittest.TestCase):
+
+    def _generate(self, client: FlowLLMClient):
+        async def generate():
+            response = await client.generate_response_async(LLMRequest(message="hi", context=""))
+            await client.aclose()
+            return response
+
+        return asyncio.run(generate())
+
+    def test_cached_endpoint_that_answers_404_is_replaced(self):
+        tried = []
+
+        def handler(request):
+            tried.append(request.url.path)
+            return httpx.Response(404) if request.url.path == _COMPLETION_ENDPOINTS[1] else _completion("ok")
+
+        client = _client(handler)
+        client._endpoint_cache["gpt-4o"] = _COMPLETION_ENDPOINTS[1]
+
+        result = self._generate(client)
+
+        self.assertTrue(result.success)
+        self.assertEqual(result.response, "ok")
+        self.assertEqual(tried, [_COMPLETION_ENDPOINTS[1], _COMPLETION_ENDPOINTS[0]])
+        self.assertEqual(client._endpoint_cache, {"gpt-4o": _COMPLETION_ENDPOINTS[0]})
+
+    def test_every_endpoint_404(self):
+        tried = []
+
+        def handler(request):
+            tried.append(request.url.path)
+            return httpx.Response(404)
+
+        client = _client(handler)
+        result = self._generate(client)
+
+        self.assertFalse(result.success)
+        self.assertIn("All API endpoints failed", result.error_message)
+        self.assertEqual(tried, list(_COMPLETION_ENDPOINTS))
+        self.assertEqual(client._endpoint_cache, {})
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,46 @@
+import os
+import tempfile
+import unittest
+from backend.rag.loader import RagLoader
+
+class TextFileNewlinesTest(unittest.TestCase):
+
+    def test_crlf_and_cr_are_read_as_newlines(self):
+        with tempfile.TemporaryDirectory() as folder:
+            with open(os.path.join(folder, "windows.txt"), "wb") as file:
+                file.write(b"line1\r\nline2\rline3\n")
+            loader = RagLoader(folder)
+            try:
+                documents = loader.load_documents_from_folder()
+            finally:
+                loader.close()
+
+        self.assertEqual([document.content for document in documents], ["line1\nline2\nline3\n"])
+
+class HashCacheTest(unittest.TestCase):
+
+    def test_hashes_are_cached_outside_the_documents_folder(self):
+        with tempfile.TemporaryDirectory() as folder, tempfile.TemporaryDirectory() as cache_folder:
+            with open(os.path.join(folder, "a.txt"), "w", encoding="utf-8") as file:
+                file.write("hello")
+            hash_cache_path = os.path.join(cache_folder, "hashes")
+
+            loader = RagLoader(folder, hash_cache_path=hash_cache_path)
+            try:
+                documents = loader.load_documents_from_folder(compute_hash=True)
+            finally:
+                loader.close()
+            self.assertEqual(os.listdir(folder), ["a.txt"])
+
+            loader = RagLoader(folder, hash_cache_path=hash_cache_path)
+            try:
+                cached = loader._cached_hashes(loader._hash_cache_keys(loader._collect_files()))
+            finally:
+                loader.close()
+
+        self.assertEqual(documents[0].sha256_hash,
+                         "2cf24dba5fb0a30e26e83b2ac5b9e29e1b161e5c1fa7425e73043362938b9824")
+        self.assertEqual(cached, [documents[0].sha256_hash])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+import os
+import tempfile
+import unittest
+from backend.rag.models import DocumentMetadata
+from backend.rag.rag_service import RAGService
+
+def _documents(count: int, topic: str = "topic"):
+    return [
+        DocumentMetadata(
+            file_path=f"/docs/doc{i}.txt",
+            file_name=f"doc{i}.txt",
+            file_size=10,
+            file_extension=".txt",
+            file_last_modified="2024-01-01T00:00:00",
+            file_relative_path=f"doc{i}.txt",
+            content=f"document number {i} about {topic} {i % 3}"
+        )
+        for i in range(count)
+    ]
+
+class ReloadOverlappingQueryTest(unittest.TestCase):
+
+    def test_query_during_reload_is_not_cached(self):
+        service = RAGService()
+        self.assertTrue(service.initialize_with_documents(_documents(5)))
+
+        embed = service.embedder.embed_documents_with_matrix
+        overlapping = []
+
+        def embed_while_querying(documents):
+            # A /chat request arriving mid-reload searches the emptied store
+            overlapping.append(service.retrieve_relevant_context("topic 1", top_k=3))
+            return embed(documents)
+
+        service.embedder.embed_documents_with_matrix = embed_while_querying
+        self.assertTrue(service.initialize_with_documents(_documents(5)))
+
+        self.assertEqual(overlapping, [[]])
+        self.assertEqual(len(service.retrieve_relevant_context("topic 1", top_k=3)), 3)
+
+class ResultsCacheTest(unittest.TestCase):
+
+    def test_reload_invalidates_cached_results(self):
+        service = RAGService()
+        self.assertTrue(service.initialize_with_documents(_documents(5)))
+        before = service.retrieve_relevant_context("topic 1", top_k=3)
+        self.assertIs(service.retrieve_relevant_context("topic 1", top_k=3)[0].document, before[0].document)
+
+        self.assertTrue(service.initialize_with_documents(_documents(5, topic="subject")))
+        after = service.retrieve_relevant_context("topic 1", top_k=3)
+
+        self.assertEqual(len(after), 3)
+        self.assertTrue(all("subject" in result.document.content for result in after))
+
+    def test_load_invalidates_cached_results(self):
+        service = RAGService()
+        self.assertTrue(service.initialize_with_documents(_documents(5, topic="subject")))
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, "store")
+            self.assertTrue(service.persist(path))
+            self.assertTrue(service.initialize_with_documents(_documents(5)))
+            service.retrieve_relevant_context("topic 1", top_k=3)
+
+            self.assertTrue(service.load(path))
+            after = service.retrieve_relevant_context("topic 1", top_k=3)
+            self.assertTrue(all("subject" in result.document.content for result in after))
+            service.vector_store.clear()  # release the memory map before the folder is removed
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,101 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+from backend.rag._kernels import int8_kernel_available
+from backend.rag.models import DocumentMetadata, EmbeddedDocument
+from backend.rag.vector_store import QUANTIZED_MIN_DOCUMENTS, SimpleVectorStore
+
+def _store(count: int, dimension: int = 8, seed: int = 0, quantized: bool = False) -> SimpleVectorStore:
+    rng = np.random.default_rng(seed)
+    store = SimpleVectorStore(quantized=quantized)
+    store.add_documents([
+        EmbeddedDocument(
+            content=f"document {i}",
+            embedding=rng.standard_normal(dimension).astype(np.float32),
+            metadata=DocumentMetadata(
+                file_path=f"/docs/doc{i}.txt",
+                file_name=f"doc{i}.txt",
+                file_size=10,
+                file_extension=".txt",
+                file_last_modified="2024-01-01T00:00:00",
+                file_relative_path=f"doc{i}.txt",
+                content=f"document {i}"
+            )
+        )
+        for i in range(count)
+    ])
+    return store
+
+def _names(results):
+    return [result.document.metadata.file_name for result in results]
+
+class TopKTest(unittest.TestCase):
+
+    def setUp(self):
+        self.store = _store(5)
+        self.query = np.random.default_rng(1).standard_normal(8).astype(np.float32)
+        self.ranking = _names(self.store.similarity_search(self.query, top_k=5))
+
+    def test_none_returns_every_document(self):
+        self.assertEqual(_names(self.store.similarity_search(self.query, top_k=None)), self.ranking)
+
+    def test_zero_returns_nothing(self):
+        self.assertEqual(self.store.similarity_search(self.query, top_k=0), [])
+
+    def test_larger_than_store_returns_every_document(self):
+        self.assertEqual(_names(self.store.similarity_search(self.query, top_k=50)), self.ranking)
+
+    def test_negative_drops_the_lowest_ranked(self):
+        self.assertEqual(_names(self.store.similarity_search(self.query, top_k=-2)), self.ranking[:-2])
+
+class RankingTest(unittest.TestCase):
+
+    def _assert_exact_top_k(self, store: SimpleVectorStore, top_k: int):
+        matrix = np.vstack([document.embedding for document in store.documents])
+        for seed in range(5):
+            query = np.random.default_rng(100 + seed).standard_normal(matrix.shape[1]).astype(np.float32)
+            query /= np.linalg.norm(query)
+            scores = matrix @ query
+            expected = np.argsort(-scores, kind="stable")[:top_k]
+
+            results = store.similarity_search(query, top_k=top_k, normalized=True)
+            self.assertEqual(_names(results), [f"doc{i}.txt" for i in expected])
+            np.testing.assert_allclose([result.similarity_score for result in results], scores[expected],
+                                       rtol=1e-5, atol=1e-6)
+
+    def test_partial_selection_matches_full_sort(self):
+        self._assert_exact_top_k(_store(1000, dimension=32), top_k=10)
+
+    @unittest.skipUnless(int8_kernel_available(), "quantized search needs numba")
+    def test_int8_search_matches_exact_ranking(self):
+        store = _store(QUANTIZED_MIN_DOCUMENTS, dimension=32, quantized=True)
+        self.assertEqual(store.embeddings_int8.shape, store.embeddings_matrix.shape)
+        self._assert_exact_top_k(store, top_k=5)
+
+class PersistTest(unittest.TestCase):
+
+    def test_round_trip(self):
+        store = _store(20)
+        query = np.random.default_rng(1).standard_normal(8).astype(np.float32)
+
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, "store")
+            store.persist(path, {"embedding_model": "placeholder"})
+            loaded = SimpleVectorStore()
+            extra = loaded.load(path)
+
+            self.assertEqual(extra, {"embedding_model": "placeholder"})
+            self.assertEqual(loaded.documents, store.documents)
+            np.testing.assert_array_equal(loaded.embeddings_matrix, store.embeddings_matrix)
+            for document, row in zip(loaded.documents, loaded.embeddings_matrix):
+                self.assertTrue(np.shares_memory(document.embedding, row))
+            self.assertEqual(
+                [(result.document.content, result.similarity_score)
+                 for result in loaded.similarity_search(query, top_k=5)],
+                [(result.document.content, result.similarity_score)
+                 for result in store.similarity_search(query, top_k=5)])
+            del loaded  # release the memory map before the folder is removed
+
+if __name__ == "__main__":
+    unittest.main()